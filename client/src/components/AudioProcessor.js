@@ -13,13 +13,16 @@ const _WS_FROM_API = _API_BASE.replace(/^http/, 'ws');
 const WS_URL = process.env.REACT_APP_API_WS || `${_WS_FROM_API}/ws/audio`;
 const MOVING_AVG_WINDOW = 3;
 const RECONNECT_DELAY = 3000;
+const FACE_SEND_INTERVAL = 200; // ms between face vectors sent for server-side fusion
 
 function AudioProcessor({ 
   mode = 'video', // Live (webcam) or video (uploaded) mode
   videoFile = null, // A file object (e.g. mp4)
   videoRef = null, // A ref to the video element to get audio stream
   setVoiceResults, 
-  setTranscriptHistory 
+  setTranscriptHistory,
+  faceVector = null, // Latest face [truth, lie] vector, sent up the socket for fusion
+  setFusionResult = null // Receives the server's `fusion` messages; enables server-side fusion
 }, ref) {
   const [results, setResults] = useState([]);
   const [transcriptHistory, setTranscriptHistoryState] = useState([]);
@@ -38,6 +41,10 @@ function AudioProcessor({
   const MAX_SEGMENTS = 50;
   const INACTIVITY_MS = 1500; // clear voice inputs after 1.5s of silence
   const lastVoiceTimestampRef = useRef(null);
+  const setFusionResultRef = useRef(setFusionResult);
+  setFusionResultRef.current = setFusionResult;
+  const lastFaceSentRef = useRef({ time: 0, payload: null });
+  const faceTimeoutRef = useRef(null);
 
   // WebSocket connection
   const connectWebSocket = () => {
@@ -58,6 +65,11 @@ function AudioProcessor({
     wsRef.current.onopen = () => {
       setConnectionStatus('connected');
       reconnectAttemptsRef.current = 0;
+      // New session on the server: turn fusion on and resend the face vector
+      lastFaceSentRef.current = { time: 0, payload: null };
+      if (setFusionResultRef.current) {
+        wsRef.current.send(JSON.stringify({ type: 'config', fusion: true }));
+      }
     };
     
     // On error, log it but don't set error status immediately (WebSocket errors are often transient)
@@ -84,6 +96,12 @@ function AudioProcessor({
       try {
         const data = JSON.parse(event.data);
 
+        // Fused face, voice and text score pushed by the server
+        if (data.type === "fusion") {
+          if (setFusionResultRef.current) setFusionResultRef.current(data);
+          return;
+        }
+
         // Only process final text segments for transcript
         if (data.type === "text_sentiment" && data.text && data.text.trim()) {
           // Skip single-word transcripts
@@ -280,6 +298,28 @@ function AudioProcessor({
     };
   }, [mode, videoRef, videoFile]);
 
+  // Send the latest face vector for server-side fusion: unchanged vectors are skipped and
+  // changes are sent at most every FACE_SEND_INTERVAL ms
+  useEffect(() => {
+    if (!setFusionResult) return;
+    const send = () => {
+      faceTimeoutRef.current = null;
+      const payload = JSON.stringify({ type: 'face', scores: Array.isArray(faceVector) ? faceVector : null });
+      if (payload === lastFaceSentRef.current.payload) return;
+      if (wsRef.current?.readyState !== WebSocket.OPEN) return;
+      wsRef.current.send(payload);
+      lastFaceSentRef.current = { time: Date.now(), payload };
+    };
+    if (faceTimeoutRef.current) clearTimeout(faceTimeoutRef.current);
+    const wait = FACE_SEND_INTERVAL - (Date.now() - lastFaceSentRef.current.time);
+    if (wait <= 0) send();
+    else faceTimeoutRef.current = setTimeout(send, wait);
+  }, [faceVector, setFusionResult]);
+
+  useEffect(() => () => {
+    if (faceTimeoutRef.current) clearTimeout(faceTimeoutRef.current);
+  }, []);
+
   // Notify parent components
   useEffect(() => {
     if (setVoiceResults) setVoiceResults(results);
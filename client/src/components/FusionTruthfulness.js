@@ -10,13 +10,16 @@ function getConfidenceLabel(score) {
   return 'High Confidence - Deceptive';
 }
 
-export default function FusionTruthfulness({ face, voice, text, setFusionScore }) {
+// With `serverResult` (the latest `fusion` message from /ws/audio, or null before the first one) the fused
+// score comes from the server and nothing is requested; without it the scores are posted to the REST endpoint.
+export default function FusionTruthfulness({ face, voice, text, setFusionScore, serverResult }) {
   const [result, setResult] = useState(null);
   const [error, setError] = useState(null);
   const lastRequestRef = useRef(0);
   const timeoutRef = useRef(null);
   const lastPayloadRef = useRef(null);
   const REQUEST_INTERVAL = 500; // ms
+  const useServer = serverResult !== undefined;
 
   useEffect(() => {
     return () => {
@@ -25,6 +28,19 @@ export default function FusionTruthfulness({ face, voice, text, setFusionScore }
   }, []);
 
   useEffect(() => {
+    if (!useServer) return;
+    setError(null);
+    setResult(serverResult);
+    if (setFusionScore) {
+      const score = serverResult && typeof serverResult.smoothed_score === 'number'
+        ? serverResult.smoothed_score
+        : (serverResult ? serverResult.score : null);
+      setFusionScore(typeof score === 'number' ? 1 - score : null);
+    }
+  }, [useServer, serverResult, setFusionScore]);
+
+  useEffect(() => {
+    if (useServer) return;
     if (!isValid(face) && !isValid(voice) && !isValid(text)) {
       setResult(null);
       if (setFusionScore) setFusionScore(null);
@@ -78,22 +94,24 @@ export default function FusionTruthfulness({ face, voice, text, setFusionScore }
           if (setFusionScore) setFusionScore(null);
         });
     }
-  }, [face, voice, text, setFusionScore]);
+  }, [useServer, face, voice, text, setFusionScore]);
 
   // Calculate truth score and presence
   const hasFace = isValid(face);
   const hasVoice = isValid(voice);
   const hasText = isValid(text);
-  const anyPresent = hasFace || hasVoice || hasText;
+  // Server results carry their own presence; local vectors may lag the server's session state
+  const anyPresent = useServer ? Boolean(serverResult && serverResult.score !== null) : (hasFace || hasVoice || hasText);
   // serverHasContrib: whether backend reported any non-zero contribution
   const serverHasContrib = result && result.contributions ? Object.values(result.contributions).some(v => v > 0) : false;
 
-  const truthScore = (result && anyPresent) ? (result.score !== null ? (1 - result.score) : null) : null;
+  const displayScore = (result && useServer && typeof result.smoothed_score === 'number') ? result.smoothed_score : (result ? result.score : null);
+  const truthScore = (result && anyPresent) ? (displayScore !== null ? (1 - displayScore) : null) : null;
   const percent = truthScore !== null ? (truthScore * 100).toFixed(1) : null;
 
   let confidenceLabel = '';
   if (truthScore !== null) {
-    confidenceLabel = getConfidenceLabel(result ? result.score : 0);
+    confidenceLabel = getConfidenceLabel(displayScore);
   } else {
     confidenceLabel = 'No Modalities Present';
   }
@@ -201,5 +219,6 @@ FusionTruthfulness.propTypes = {
   face: PropTypes.array,
   voice: PropTypes.array,
   text: PropTypes.array,
-  setFusionScore: PropTypes.func
+  setFusionScore: PropTypes.func,
+  serverResult: PropTypes.object
 };
\ No newline at end of file
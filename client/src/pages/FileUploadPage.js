@@ -16,6 +16,7 @@ export default function FileUploadPage() {
   const [transcriptHistory, setTranscriptHistory] = useState([]);
   const [deceptionTimeline, setDeceptionTimeline] = useState([]);
   const [fusionScore, setFusionScore] = useState(null);
+  const [fusionResult, setFusionResult] = useState(null); // Pushed by the server over /ws/audio
   const [videoRef, setVideoRef] = useState(null);
   const [exporting, setExporting] = useState(false);
   const audioRef = useRef(null);
@@ -97,6 +98,7 @@ export default function FileUploadPage() {
     setTranscriptHistory([]);
     setDeceptionTimeline([]);
     setFusionScore(null);
+    setFusionResult(null);
   };
 
   async function exportSession() {
@@ -166,6 +168,7 @@ export default function FileUploadPage() {
         try { setFaceEmotions([]); } catch (e) { }
         try { setDeceptionTimeline([]); } catch (e) { }
         try { setFusionScore(null); } catch (e) { }
+        try { setFusionResult(null); } catch (e) { }
 
   // Also clear internal buffers in AudioProcessor
   try { audioRef.current?.clear(); } catch (e) { }
@@ -262,6 +265,8 @@ export default function FileUploadPage() {
                 videoRef={videoRef}
                 setVoiceResults={setVoiceResults}
                 setTranscriptHistory={setTranscriptHistory}
+                faceVector={faceVec || null}
+                setFusionResult={setFusionResult}
               />
             </section>
             <section className="face-section">
@@ -305,7 +310,7 @@ export default function FileUploadPage() {
         {uploadedFile ? (
           <>
             <div className="third-pane-content">
-              <FusionTruthfulness face={faceVec || [0, 0]} voice={voiceVec || [0, 0]} text={textVec || [0, 0]} setFusionScore={setFusionScore} />
+              <FusionTruthfulness face={faceVec || [0, 0]} voice={voiceVec || [0, 0]} text={textVec || [0, 0]} setFusionScore={setFusionScore} serverResult={fusionResult} />
               <DeceptionTimeline timeline={deceptionTimeline} currentScore={fusionScore} />
             </div>
           </>
@@ -13,6 +13,7 @@ export default function WebcamPage() {
   const [transcriptHistory, setTranscriptHistory] = useState([]);
   const [deceptionTimeline, setDeceptionTimeline] = useState([]);
   const [fusionScore, setFusionScore] = useState(null);
+  const [fusionResult, setFusionResult] = useState(null); // Pushed by the server over /ws/audio
   const [videoRef, setVideoRef] = useState(null);
   const audioRef = useRef(null);
 
@@ -145,6 +146,7 @@ export default function WebcamPage() {
         try { setFaceEmotions([]); } catch (e) { }
         try { setDeceptionTimeline([]); } catch (e) { }
         try { setFusionScore(null); } catch (e) { }
+        try { setFusionResult(null); } catch (e) { }
 
   // Also clear internal buffers in AudioProcessor
   try { audioRef.current?.clear(); } catch (e) { }
@@ -193,6 +195,8 @@ export default function WebcamPage() {
             mode="live"
             setVoiceResults={setVoiceResults}
             setTranscriptHistory={setTranscriptHistory}
+            faceVector={faceVec || null}
+            setFusionResult={setFusionResult}
           />
         </section>
         <section className="face-section">
@@ -217,7 +221,7 @@ export default function WebcamPage() {
     <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 640 640" width="18" height="18" focusable="false" aria-hidden="true"><path d="M128 128C128 110.3 113.7 96 96 96C78.3 96 64 110.3 64 128L64 464C64 508.2 99.8 544 144 544L544 544C561.7 544 576 529.7 576 512C576 494.3 561.7 480 544 480L144 480C135.2 480 128 472.8 128 464L128 128zM534.6 214.6C547.1 202.1 547.1 181.8 534.6 169.3C522.1 156.8 501.8 156.8 489.3 169.3L384 274.7L326.6 217.4C314.1 204.9 293.8 204.9 281.3 217.4L185.3 313.4C172.8 325.9 172.8 346.2 185.3 358.7C197.8 371.2 218.1 371.2 230.6 358.7L304 285.3L361.4 342.7C373.9 355.2 394.2 355.2 406.7 342.7L534.7 214.7z" fill="currentColor"/></svg>
   </span>Overall Truthfulness</h2>
         <div className="third-pane-content">
-          <FusionTruthfulness face={faceVec || [0, 0]} voice={voiceVec || [0, 0]} text={textVec || [0, 0]} setFusionScore={setFusionScore} />
+          <FusionTruthfulness face={faceVec || [0, 0]} voice={voiceVec || [0, 0]} text={textVec || [0, 0]} setFusionScore={setFusionScore} serverResult={fusionResult} />
           <DeceptionTimeline timeline={deceptionTimeline} currentScore={fusionScore} />
         </div>
       </div>
@@ -1,4 +1,5 @@
 import sys
+import time
 import asyncio
 import logging
 
@@ -15,10 +16,15 @@ from fastapi.middleware.cors import CORSMiddleware
 # Import routers]
 from model_api import voice_api as voice_api_module
 from model_api import text_api as text_api_module
+from model_api import export_api as export_api_module
 from model_api.voice_api import router as voice_router
 from model_api.text_api import router as text_router
 from model_api.fusion_api import router as fusion_router
 from model_api.export_api import router as export_router
+from model_api.metrics_api import router as metrics_router
+from model_api.analysis_api import router as analysis_router
+from model_api.jobs_api import router as jobs_router
+from model_api.health_api import router as health_router
 
 # Disable uvicorn access logs
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
@@ -40,12 +46,23 @@ app.include_router(voice_router)
 app.include_router(text_router)
 app.include_router(fusion_router) 
 app.include_router(export_router)
+app.include_router(metrics_router)
+app.include_router(analysis_router)
+app.include_router(jobs_router)
+app.include_router(health_router)
 
 @app.on_event("startup")
 async def startup_event():
     """Optionally initialize heavy models on startup. Set `PRELOAD_MODELS=1` to enable preloading."""
     import os
 
+    # Warm the PDF browser pool unless `PDF_POOL_WARM=0`; otherwise it starts on the first export
+    if os.environ.get('PDF_POOL_WARM', '1') in ('1', 'true', 'yes', 'True'):
+        try:
+            await export_api_module.start_pdf_pool()
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"PDF browser pool could not start: {e}")
+
     preload = os.environ.get('PRELOAD_MODELS', '0')
     if preload not in ('1', 'true', 'yes', 'True'):
         logging.getLogger(__name__).info("PRELOAD_MODELS not set — skipping heavy model initialization on startup.")
@@ -63,4 +80,12 @@ async def startup_event():
         except Exception as e:
             logging.getLogger(__name__).warning(f"Voice model initialization failed on startup: {e}")
 
-    await asyncio.gather(_init_text(), _init_voice())
\ No newline at end of file
+    # Text, voice emotion and Vosk models load in parallel worker threads
+    start_time = time.time()
+    await asyncio.gather(_init_text(), _init_voice())
+    logging.getLogger(__name__).info(f"Model preloading finished in {time.time() - start_time:.2f}s")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await export_api_module.stop_pdf_pool()
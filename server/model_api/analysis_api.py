@@ -0,0 +1,322 @@
+from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException
+import io
+import wave
+import struct
+import os
+import time
+import logging
+import json
+import asyncio
+from bisect import bisect_right
+import numpy as np
+
+from model_api import voice_api as voice_api_module
+from model_api import text_api as text_api_module
+from model_api.fusion_api import rule_based_fusion, voice_vector, text_vector
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# The live pipeline runs at 16 kHz; uploads are resampled to this rate.
+SAMPLE_RATE = 16000
+
+# Offline analysis settings. Audio is fed to Vosk and VAD in `ANALYSIS_CHUNK_SECONDS` chunks, and
+# speech windows go through the emotion model `ANALYSIS_EMOTION_BATCH_SIZE` at a time.
+_analysis_config = {
+    'chunk_seconds': max(0.1, float(os.environ.get('ANALYSIS_CHUNK_SECONDS', '0.5'))),
+    'emotion_batch_size': max(1, int(os.environ.get('ANALYSIS_EMOTION_BATCH_SIZE', '16'))),
+    'window_seconds': 1.5,  # Same window length as the live /ws/audio path
+}
+
+
+# WAV format tags; WAVE_FORMAT_EXTENSIBLE carries the real tag in the first two bytes of its subformat GUID
+_WAVE_FORMAT_IEEE_FLOAT = 3
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _read_float_wav(raw: bytes):
+    """Read an IEEE float WAV, which the `wave` module rejects. Returns (channels, sample rate, float32 samples)."""
+    fmt = None
+    data = None
+    pos = 12
+    while pos + 8 <= len(raw):
+        chunk_id = raw[pos:pos + 4]
+        size = struct.unpack('<I', raw[pos + 4:pos + 8])[0]
+        body = raw[pos + 8:pos + 8 + size]
+        if chunk_id == b'fmt ' and len(body) >= 16:
+            fmt = body
+        elif chunk_id == b'data':
+            data = body
+        pos += 8 + size + (size & 1)  # Chunks are padded to an even size
+    if fmt is None or data is None:
+        raise ValueError("Invalid WAV file: missing fmt or data chunk")
+
+    tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+    if tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        tag = struct.unpack('<H', fmt[24:26])[0]
+    if tag != _WAVE_FORMAT_IEEE_FLOAT:
+        raise ValueError(f"Unsupported WAV format tag: {tag}")
+    if bits == 32:
+        dtype = '<f4'
+    elif bits == 64:
+        dtype = '<f8'
+    else:
+        raise ValueError(f"Unsupported float WAV sample size: {bits} bits")
+    usable = len(data) - len(data) % (bits // 8)
+    return max(1, channels), sample_rate, np.frombuffer(data[:usable], dtype=dtype).astype(np.float32)
+
+
+def decode_audio(raw: bytes, sample_rate: int = SAMPLE_RATE):
+    """Decode a WAV file (PCM or IEEE float, or raw little-endian int16 mono PCM at sample_rate) to 16 kHz mono int16."""
+    if raw[:4] == b'RIFF' and raw[8:12] == b'WAVE':
+        try:
+            with wave.open(io.BytesIO(raw), 'rb') as wf:
+                channels = wf.getnchannels()
+                width = wf.getsampwidth()
+                sample_rate = wf.getframerate()
+                frames = wf.readframes(wf.getnframes())
+        except wave.Error:
+            # The wave module only reads PCM; float WAVs (e.g. from browser recorders) are parsed here
+            channels, sample_rate, audio = _read_float_wav(raw)
+        except EOFError:
+            raise ValueError("Invalid WAV file: truncated header")
+        else:
+            if width == 1:
+                audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+            elif width == 2:
+                audio = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+            elif width == 3:
+                # 24-bit: put each sample in the top three bytes of an int32, which keeps the sign
+                triples = np.frombuffer(frames[:len(frames) - len(frames) % 3], dtype=np.uint8).reshape(-1, 3)
+                padded = np.zeros((len(triples), 4), dtype=np.uint8)
+                padded[:, 1:] = triples
+                audio = padded.view('<i4').ravel().astype(np.float32) / 2147483648.0
+            elif width == 4:
+                audio = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+            else:
+                raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+        # Mix down to mono
+        if channels > 1:
+            audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+    else:
+        usable = len(raw) - (len(raw) % 2)
+        audio = np.frombuffer(raw, dtype='<i2', count=usable // 2).astype(np.float32) / 32768.0
+
+    if sample_rate <= 0:
+        raise ValueError(f"Invalid sample rate: {sample_rate}")
+    if sample_rate != SAMPLE_RATE:
+        from math import gcd
+        from scipy.signal import resample_poly
+        g = gcd(SAMPLE_RATE, int(sample_rate))
+        audio = resample_poly(audio, SAMPLE_RATE // g, int(sample_rate) // g)
+
+    return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def _transcribe_and_detect(pcm, progress=None):
+    """Single pass over the recording: Vosk final utterances and VAD speech segments, in seconds."""
+    recognizer = voice_api_module._state['KaldiRecognizer'](voice_api_module._state['vosk_model'], SAMPLE_RATE)
+    recognizer.SetWords(True)
+    # Every segment of the recording is needed, so the segment list is unbounded
+    session_vad = voice_api_module.StreamingVAD(
+        SAMPLE_RATE, _analysis_config['window_seconds'], aggressiveness=2, max_segments=None
+    )
+
+    utterances = []
+
+    def collect(result_json, chunk_end):
+        result = json.loads(result_json)
+        text = result.get("text", "")
+        if not text.strip():
+            return
+        words = result.get("result") or []
+        start = words[0].get("start", chunk_end) if words else chunk_end
+        end = words[-1].get("end", chunk_end) if words else chunk_end
+        utterances.append({"start": round(start, 2), "end": round(end, 2), "text": text})
+
+    chunk = int(_analysis_config['chunk_seconds'] * SAMPLE_RATE)
+    total = len(pcm)
+    for offset in range(0, total, chunk):
+        samples = pcm[offset:offset + chunk]
+        session_vad.feed(samples)
+        if recognizer.AcceptWaveform(samples.tobytes()):
+            collect(recognizer.Result(), (offset + len(samples)) / SAMPLE_RATE)
+        if progress is not None:
+            progress(min(offset + chunk, total) / max(total, 1))
+    collect(recognizer.FinalResult(), total / SAMPLE_RATE)
+
+    return utterances, session_vad.finish()
+
+
+def _speech_windows(segments, duration):
+    """Cover each speech segment with fixed-length windows, so every window in a batch has the same length."""
+    window = _analysis_config['window_seconds']
+    windows = []
+    for start, end in segments:
+        if end - start <= window:
+            # Center a full window on short segments, clamped to the recording
+            mid = (start + end) / 2
+            w_start = min(max(0.0, mid - window / 2), max(0.0, duration - window))
+            windows.append((w_start, min(duration, w_start + window)))
+            continue
+        w_start = start
+        while w_start + window < end:
+            windows.append((w_start, w_start + window))
+            w_start += window
+        # Last window is aligned to the segment end
+        windows.append((end - window, end))
+    return windows
+
+
+def _emphasize_recording(pcm):
+    """Bandpass and pre-emphasis over the whole recording in one pass; gating and normalization are per window."""
+    audio = pcm.astype(np.float32) / 32767.0
+    filtered = voice_api_module.bandpass_filter(audio, 80, 8000, SAMPLE_RATE)
+    emphasized = np.append(filtered[0], filtered[1:] - 0.97 * filtered[:-1]) if len(filtered) else filtered
+    return emphasized.astype(np.float32)
+
+
+def _analyze_emotion_batch(emphasized, windows):
+    """Gate, normalize and score one batch of windows."""
+    arrays = [
+        voice_api_module._gate_and_normalize(emphasized[int(s * SAMPLE_RATE):int(e * SAMPLE_RATE)], SAMPLE_RATE)
+        for s, e in windows
+    ]
+    scores, _ = voice_api_module.analyze_emotion_batch(arrays, SAMPLE_RATE)
+    return scores
+
+
+async def _analyze_emotions(pcm, windows, progress=None):
+    """Run emotion inference over the windows, one emotion executor job per batch.
+
+    The executor is shared with live sessions; submitting each batch separately lets their batches run
+    in between instead of waiting for the whole recording.
+    """
+    emphasized = await asyncio.to_thread(_emphasize_recording, pcm)
+    loop = asyncio.get_running_loop()
+    scores = []
+    batch_size = _analysis_config['emotion_batch_size']
+    for i in range(0, len(windows), batch_size):
+        scores.extend(await loop.run_in_executor(
+            voice_api_module._get_emotion_executor(), _analyze_emotion_batch, emphasized, windows[i:i + batch_size]
+        ))
+        if progress is not None:
+            progress(len(scores) / len(windows))
+    return scores
+
+
+def _text_vector(item):
+    return text_vector(item.get("label"), item.get("score"))
+
+
+def _build_timeline(windows, emotions, transcript):
+    """Fuse voice and the latest text score at each speech window. Scores are truthfulness, like the live timeline."""
+    timeline = []
+    voice_timeline = []
+    starts = [seg["start"] for seg in transcript]
+    for (start, end), emotion in zip(windows, emotions):
+        modalities = {"voice": voice_vector(emotion)}
+        # Latest utterance that started before this window ends
+        latest = bisect_right(starts, end) - 1
+        if latest >= 0:
+            text_vec = _text_vector(transcript[latest])
+            if text_vec is not None:
+                modalities["text"] = text_vec
+
+        fused = rule_based_fusion(modalities)
+        voice_timeline.append({"start": round(start, 2), "end": round(end, 2), "emotion": emotion})
+        if fused['score'] is not None:
+            timeline.append({"t": round(end, 2), "score": round(1 - fused['score'], 4)})
+    return timeline, voice_timeline
+
+
+async def analyze_recording(raw: bytes, sample_rate: int = SAMPLE_RATE, session_id=None, app=None, progress=None):
+    """Run the VAD, Vosk, emotion and text pipeline over a whole recording.
+
+    Returns a session dict in the shape `/api/export-summary` consumes. `progress(fraction, stage, partial)`
+    is called as the work advances, possibly from a worker thread; `partial` carries intermediate
+    results (transcript, speech segments) once they are known.
+    """
+    def report(fraction, stage, partial=None):
+        if progress is not None:
+            try:
+                progress(fraction, stage, partial)
+            except Exception:
+                logger.debug("Progress callback failed", exc_info=True)
+
+    start_time = time.time()
+    await voice_api_module.init_voice_models(app)
+    if voice_api_module._state.get('vosk_model') is None:
+        raise RuntimeError("Voice models are not available")
+
+    pcm = await asyncio.to_thread(decode_audio, raw, sample_rate)
+    duration = len(pcm) / SAMPLE_RATE
+    report(0.05, "decoded")
+
+    # Transcription and VAD take the bulk of the time; report them as 5-60%
+    utterances, segments = await asyncio.to_thread(
+        _transcribe_and_detect, pcm, lambda f: report(0.05 + 0.55 * f, "transcribing")
+    )
+    report(0.6, "transcribed", {"speech_segments": [[round(s, 2), round(e, 2)] for s, e in segments]})
+
+    windows = _speech_windows(segments, duration)
+    # Emotion inference reported as 60-85%
+    emotions = await _analyze_emotions(pcm, windows, lambda f: report(0.6 + 0.25 * f, "emotion"))
+    report(0.85, "emotion")
+
+    scored = await text_api_module.score_texts([u["text"] for u in utterances], app)
+    transcript = [
+        {**u, "label": s.get("label"), "score": s.get("score")}
+        for u, s in zip(utterances, scored)
+    ]
+    report(0.95, "text", {"transcript": transcript})
+
+    timeline, voice_timeline = _build_timeline(windows, emotions, transcript)
+    fusion_score = round(sum(p["score"] for p in timeline) / len(timeline), 4) if timeline else None
+
+    # Average deception per modality, as the live view reports it
+    voice_lie = [v["emotion"].get('ang', 0.0) + v["emotion"].get('sad', 0.0) for v in voice_timeline]
+    text_lie = [vec[1] for vec in (_text_vector(t) for t in transcript) if vec is not None]
+
+    total_time = time.time() - start_time
+    logger.info(
+        f"Recording analysis completed - Duration: {duration:.1f}s, Total: {total_time:.2f}s "
+        f"({duration / total_time if total_time > 0 else 0:.1f}x real time), utterances: {len(transcript)}, "
+        f"speech windows: {len(windows)}"
+    )
+    report(1.0, "done")
+
+    return {
+        "session_id": session_id or f"upload-{int(time.time() * 1000)}",
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "duration": round(duration, 2),
+        "fusion_score": fusion_score,
+        "modalities": {
+            "voice": round(sum(voice_lie) / len(voice_lie), 4) if voice_lie else None,
+            "text": round(sum(text_lie) / len(text_lie), 4) if text_lie else None,
+        },
+        "timeline": timeline,
+        "transcript": transcript,
+        "voice_timeline": voice_timeline,
+        "speech_segments": [[round(s, 2), round(e, 2)] for s, e in segments],
+    }
+
+
+@router.post("/api/analyze-recording")
+async def analyze_recording_upload(
+    request: Request,
+    file: UploadFile = File(...),
+    sample_rate: int = Form(SAMPLE_RATE),
+    session_id: str = Form(None),
+):
+    """Analyze an uploaded WAV (or raw 16-bit mono PCM at `sample_rate`) faster than real time."""
+    raw = await file.read()
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    try:
+        return await analyze_recording(raw, sample_rate, session_id, request.app)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
@@ -1,15 +1,20 @@
 from fastapi import APIRouter, Request, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from fastapi.responses import Response, JSONResponse
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 from datetime import datetime
 import asyncio
-import tempfile
+import time
+import json
+import hashlib
+from collections import OrderedDict
 import os
 import logging
 import traceback
 import sys
 import re
-from starlette.background import BackgroundTask
+import numpy as np
+
+from model_api import metrics_api
 
 router = APIRouter()
 
@@ -20,29 +25,547 @@ if not logger.handlers:
     logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+# PDF rendering settings. A long-lived Chromium serves exports from `PDF_POOL_SIZE` reusable browser
+# contexts; each context is replaced after `PDF_RECYCLE_AFTER` renders to cap memory growth.
+_pdf_config = {
+    'pool_size': max(1, int(os.environ.get('PDF_POOL_SIZE', '2'))),
+    'recycle_after': max(1, int(os.environ.get('PDF_RECYCLE_AFTER', '50'))),
+    'health_interval_seconds': max(1.0, float(os.environ.get('PDF_HEALTH_INTERVAL_SECONDS', '30'))),
+    'render_timeout_seconds': max(1.0, float(os.environ.get('PDF_RENDER_TIMEOUT_SECONDS', '30'))),
+    # After a failed launch, exports fail fast until the retry delay passes; it doubles per failure up to the max
+    'launch_retry_seconds': max(1.0, float(os.environ.get('PDF_LAUNCH_RETRY_SECONDS', '5'))),
+    'launch_retry_max_seconds': max(1.0, float(os.environ.get('PDF_LAUNCH_RETRY_MAX_SECONDS', '300'))),
+}
+
+
+class BrowserPool:
+    """Warm headless Chromium with a fixed set of browser contexts.
+
+    At most `size` renders run at once: a render borrows an idle context from the queue and gives it back
+    when done. A background task relaunches the browser if it dies.
+    """
+
+    def __init__(self, size, recycle_after):
+        self.size = size
+        self.recycle_after = recycle_after
+        self.playwright = None
+        self.browser = None
+        self.contexts = asyncio.Queue()  # Idle [context, renders, generation] slots
+        self.generation = 0
+        self.loop = None
+        self.lock = asyncio.Lock()
+        self.health_task = None
+        self.renders = 0
+        self.recycled = 0
+        self.restarts = 0
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+
+        self.loop = asyncio.get_running_loop()
+        start_time = time.time()
+        self.playwright = await async_playwright().start()
+        try:
+            await self._launch()
+        except BaseException:
+            # Don't leave the driver subprocess (or a half-started browser) behind
+            try:
+                await self.close()
+            except Exception:
+                logger.exception("Failed to clean up after PDF browser launch failure")
+            raise
+        self.health_task = self.loop.create_task(self._health_loop())
+        logger.info("PDF browser pool ready: %d contexts in %.2fs", self.size, time.time() - start_time)
+
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(headless=True)
+        for _ in range(self.size):
+            self.contexts.put_nowait([await self.browser.new_context(), 0, self.generation])
+
+    async def _relaunch(self):
+        async with self.lock:
+            logger.warning("PDF browser is not responding, relaunching")
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            # Slots of the old browser are dropped; waiters pick up the new ones from the same queue
+            self.generation += 1
+            while not self.contexts.empty():
+                self.contexts.get_nowait()
+            await self._launch()
+            self.restarts += 1
+
+    def healthy(self):
+        return self.browser is not None and self.browser.is_connected()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(_pdf_config['health_interval_seconds'])
+            if not self.healthy():
+                try:
+                    await self._relaunch()
+                except Exception:
+                    logger.exception("Failed to relaunch PDF browser")
+
+    async def _replace_context(self, slot):
+        try:
+            await slot[0].close()
+        except Exception:
+            pass
+        slot[0] = await self.browser.new_context()
+        slot[1] = 0
+
+    async def render(self, html: str) -> bytes:
+        slot = await self.contexts.get()
+        healthy = False
+        try:
+            page = await slot[0].new_page()
+            try:
+                await page.set_content(html, wait_until='networkidle')
+                # Save to PDF with print background and A4 format
+                pdf = await page.pdf(format='A4', print_background=True)
+            finally:
+                await page.close()
+            healthy = True
+            slot[1] += 1
+            self.renders += 1
+            return pdf
+        finally:
+            if slot[2] == self.generation:
+                try:
+                    # Replace a context that failed mid-render or reached its render budget
+                    if not healthy or slot[1] >= self.recycle_after:
+                        await self._replace_context(slot)
+                        self.recycled += 1
+                except Exception:
+                    logger.exception("Failed to recycle PDF browser context")
+                self.contexts.put_nowait(slot)
+
+    async def close(self):
+        if self.health_task is not None:
+            self.health_task.cancel()
+        try:
+            if self.browser is not None:
+                await self.browser.close()
+        finally:
+            if self.playwright is not None:
+                await self.playwright.stop()
+        self.browser = None
+        self.playwright = None
+
+    def stats(self):
+        return {
+            "healthy": self.healthy(),
+            "size": self.size,
+            "idle": self.contexts.qsize(),
+            "renders": self.renders,
+            "recycled": self.recycled,
+            "restarts": self.restarts,
+        }
+
+
+_state = {
+    'pool': None,
+    'pool_lock': None,
+    'pool_lock_loop': None,
+    'inflight': {},  # cache key -> future of a render in progress
+    'async_unsupported': False,  # Set when the event loop can't spawn subprocesses (Windows selector loop)
+    'launch_failures': 0,
+    'launch_retry_at': 0.0,  # time.monotonic() before which no new launch is attempted
+    'launch_error': None,
+}
+
+
+async def start_pdf_pool():
+    """Launch the browser pool for this event loop, if it isn't running already."""
+    loop = asyncio.get_running_loop()
+    pool = _state['pool']
+    if pool is not None and pool.loop is loop:
+        return pool
+    if _state['pool_lock_loop'] is not loop:
+        _state['pool_lock'] = asyncio.Lock()
+        _state['pool_lock_loop'] = loop
+    async with _state['pool_lock']:
+        pool = _state['pool']
+        if pool is not None and pool.loop is loop:
+            return pool
+        now = time.monotonic()
+        if now < _state['launch_retry_at']:
+            raise RuntimeError(
+                f"PDF browser unavailable, next launch attempt in {_state['launch_retry_at'] - now:.0f}s: "
+                f"{_state['launch_error']}"
+            )
+        pool = BrowserPool(_pdf_config['pool_size'], _pdf_config['recycle_after'])
+        try:
+            await pool.start()
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            _state['launch_failures'] += 1
+            delay = min(
+                _pdf_config['launch_retry_max_seconds'],
+                _pdf_config['launch_retry_seconds'] * 2 ** (_state['launch_failures'] - 1),
+            )
+            _state['launch_retry_at'] = time.monotonic() + delay
+            _state['launch_error'] = str(e)
+            logger.warning(f"PDF browser pool failed to start (attempt {_state['launch_failures']}), retrying in {delay:.0f}s: {e}")
+            raise
+        _state['launch_failures'] = 0
+        _state['launch_retry_at'] = 0.0
+        _state['launch_error'] = None
+        _state['pool'] = pool
+        return pool
+
+
+async def stop_pdf_pool():
+    pool = _state['pool']
+    _state['pool'] = None
+    if pool is not None and pool.loop is asyncio.get_running_loop():
+        try:
+            await pool.close()
+        except Exception:
+            logger.exception("Failed to close PDF browser pool")
+
+
+def _render_pdf_sync(html: str) -> bytes:
+    # One-off browser through the sync API, for event loops without subprocess support
+    # (asyncio's selector loop on Windows raises NotImplementedError).
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(html, wait_until='networkidle')
+        pdf = page.pdf(format='A4', print_background=True)
+        browser.close()
+        return pdf
+
+
 # Use Playwright to render HTML to PDF.
-async def _html_to_pdf(html: str, output_path: str):
-    # Use Playwright synchronous API inside a separate thread to avoid
-    # running Playwright's subprocess creation on the asyncio event loop which
-    # can raise NotImplementedError on some Windows setups.
+async def _render_pdf(html: str) -> bytes:
     try:
-        from playwright.sync_api import sync_playwright
+        import playwright  # noqa: F401
     except Exception as e:
         raise RuntimeError(
-            "playwright (sync API) is required: run `pip install playwright` and then `python -m playwright install` in the server venv") from e
+            "playwright is required: run `pip install playwright` and then `python -m playwright install` in the server venv") from e
+
+    with metrics_api.timer('pdf_render'):
+        if not _state['async_unsupported']:
+            try:
+                pool = await start_pdf_pool()
+            except NotImplementedError:
+                logger.warning("Event loop can't launch subprocesses; falling back to per-request sync Playwright")
+                _state['async_unsupported'] = True
+            else:
+                return await asyncio.wait_for(pool.render(html), timeout=_pdf_config['render_timeout_seconds'])
+        return await asyncio.to_thread(_render_pdf_sync, html)
+
+
+@router.get("/api/export-summary/pool")
+async def pdf_pool_stats():
+    pool = _state['pool']
+    if pool is not None:
+        return pool.stats()
+    return {
+        "healthy": False,
+        "size": _pdf_config['pool_size'],
+        "started": False,
+        "launch_failures": _state['launch_failures'],
+        "launch_error": _state['launch_error'],
+        "retry_in_seconds": round(max(0.0, _state['launch_retry_at'] - time.monotonic()), 1),
+    }
+
+
+# Helper filter: convert epoch-ms (number) to HH:MM:SS for compact timestamps in PDFs
+def _fmt_time(ms):
+    """Strict formatter: accept ISO string or numeric epoch-ms and return HH:MM:SS, otherwise ''."""
+    if ms is None:
+        return ''
+    # ISO string
+    if isinstance(ms, str):
+        try:
+            dt = datetime.fromisoformat(ms.replace('Z', '+00:00'))
+            return dt.strftime('%H:%M:%S')
+        except Exception:
+            return ''
+    # numeric epoch-ms
+    if isinstance(ms, (int, float)):
+        try:
+            dt = datetime.fromtimestamp(float(ms) / 1000.0)
+            return dt.strftime('%H:%M:%S')
+        except Exception:
+            return ''
+    return ''
+
+
+# Helper filter: format a full datetime for cover/title lines
+def _fmt_datetime(val):
+    """Strict datetime formatter: accept ISO string or numeric epoch-ms and return friendly localized string, otherwise ''."""
+    if val is None:
+        return ''
+    if isinstance(val, str):
+        try:
+            dt = datetime.fromisoformat(val.replace('Z', '+00:00'))
+        except Exception:
+            return ''
+    else:
+        try:
+            dt = datetime.fromtimestamp(float(val) / 1000.0)
+        except Exception:
+            return ''
+    try:
+        dt_local = dt.astimezone()
+    except Exception:
+        dt_local = dt
+    return dt_local.strftime('%b %d, %Y, %I:%M %p')
+
+
+# Helper filter: format a time offset (seconds or milliseconds) as MM:SS or H:MM:SS
+def _fmt_offset(val):
+    """Format an offset in seconds or milliseconds to MM:SS or H:MM:SS. Accepts numeric or numeric string. No epoch fallbacks."""
+    if val is None:
+        return ''
+    try:
+        if isinstance(val, str):
+            v = float(val)
+        else:
+            v = float(val)
+    except Exception:
+        return ''
+
+    # Treat values >1000 as milliseconds
+    if v > 1000:
+        total_seconds = int(round(v / 1000.0))
+    else:
+        total_seconds = int(round(v))
+
+    hours, rem = divmod(total_seconds, 3600)
+    minutes, seconds = divmod(rem, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+# The template environment is built once. Compiled templates are cached to disk so restarts skip
+# compilation too, in Jinja's per-user private temp directory unless `EXPORT_TEMPLATE_CACHE_DIR` is set;
+# set `EXPORT_TEMPLATE_AUTO_RELOAD=1` to pick up template edits without restarting.
+_template_config = {
+    'dir': os.path.join(os.path.dirname(__file__), 'templates'),
+    'name': 'summary.html',
+    'auto_reload': os.environ.get('EXPORT_TEMPLATE_AUTO_RELOAD', '0') in ('1', 'true', 'yes', 'True'),
+    'bytecode_cache_dir': os.environ.get('EXPORT_TEMPLATE_CACHE_DIR') or None,
+}
+
+
+def _build_template_env():
+    bytecode_cache = None
+    try:
+        cache_dir = _template_config['bytecode_cache_dir']
+        if cache_dir:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        # Without a directory Jinja uses _jinja2-cache-<uid> in the temp dir, created 0700 and owner-checked
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    except Exception:
+        logger.warning("Template bytecode cache unavailable, compiling in memory only", exc_info=True)
+    env = Environment(
+        loader=FileSystemLoader(_template_config['dir']),
+        autoescape=select_autoescape(['html', 'xml']),
+        auto_reload=_template_config['auto_reload'],
+        bytecode_cache=bytecode_cache,
+    )
+    env.filters['fmt_time'] = _fmt_time
+    env.filters['fmt_datetime'] = _fmt_datetime
+    env.filters['fmt_offset'] = _fmt_offset
+    return env
 
-    def render_sync():
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.set_content(html, wait_until='networkidle')
 
-            # Save to PDF with print background and A4 format
-            page.pdf(path=output_path, format='A4', print_background=True)
-            browser.close()
+_template_env = _build_template_env()
+_summary_template = _template_env.get_template(_template_config['name'])
 
-    # Run blocking Playwright sync code in a thread so it doesn't block the event loop
-    await asyncio.to_thread(render_sync)
+
+# Timelines longer than `EXPORT_TIMELINE_MAX_POINTS` are reduced before rendering
+_timeline_config = {
+    'max_points': max(4, int(os.environ.get('EXPORT_TIMELINE_MAX_POINTS', '500'))),
+    'svg_width': 600,
+    'svg_height': 160,
+}
+
+
+def _as_float(value, default=np.nan):
+    """Float value of a timeline field; missing or unparseable values become `default`."""
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _timeline_arrays(timeline):
+    """Times and scores of timeline entries as float arrays. Accepts `time` (epoch ms) or `t` (seconds) keys.
+
+    Missing or non-numeric scores and times are NaN.
+    """
+    times = np.fromiter(
+        (_as_float(p.get('time', p.get('t', i))) if isinstance(p, dict) else i for i, p in enumerate(timeline)),
+        dtype=np.float64, count=len(timeline),
+    )
+    scores = np.fromiter(
+        (_as_float(p.get('score')) if isinstance(p, dict) else np.nan for p in timeline),
+        dtype=np.float64, count=len(timeline),
+    )
+    return times, scores
+
+
+def downsample_indices(scores, max_points):
+    """Indices of points to keep with min/max bucketing: the first and last points plus the lowest and
+    highest score in each bucket, in their original order. Peaks and dips always survive."""
+    n = len(scores)
+    if n <= max_points:
+        return np.arange(n)
+    n_buckets = max(1, (max_points - 2) // 2)
+    inner = np.arange(1, n - 1)
+    bucket = (inner - 1) * n_buckets // (n - 2)
+    values = scores[inner]
+    missing = np.isnan(values)
+    # Missing scores sort last for the minimum and first for the maximum, so they are only picked when
+    # the whole bucket is missing
+    min_order = np.lexsort((np.where(missing, np.inf, values), bucket))
+    max_order = np.lexsort((np.where(missing, -np.inf, values), bucket))
+    sorted_buckets = bucket[min_order]
+    starts = np.flatnonzero(np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]])
+    ends = np.r_[starts[1:], len(min_order)] - 1
+    keep = np.unique(np.concatenate(([0, n - 1], inner[min_order[starts]], inner[max_order[ends]])))
+    return keep
+
+
+def downsample_timeline(timeline, max_points=None):
+    """Reduce a timeline to at most `max_points` entries. Kept entries are returned unchanged."""
+    max_points = max_points or _timeline_config['max_points']
+    if not isinstance(timeline, list) or len(timeline) <= max_points:
+        return timeline
+    _, scores = _timeline_arrays(timeline)
+    return [timeline[i] for i in downsample_indices(scores, max_points)]
+
+
+def timeline_svg_points(timeline):
+    """Polyline points for the inline timeline chart, scaled to the SVG viewBox. Scores are 0-1."""
+    if not isinstance(timeline, list) or len(timeline) < 2:
+        return ''
+    times, scores = _timeline_arrays(timeline)
+    valid = ~np.isnan(scores) & ~np.isnan(times)
+    times, scores = times[valid], scores[valid]
+    if len(times) < 2:
+        return ''
+    span = times[-1] - times[0]
+    x = (times - times[0]) / span if span > 0 else np.linspace(0.0, 1.0, len(times))
+    x = x * _timeline_config['svg_width']
+    y = (1.0 - np.clip(scores, 0.0, 1.0)) * _timeline_config['svg_height']
+    return ' '.join(f"{a:.1f},{b:.1f}" for a, b in zip(x, y))
+
+
+def _prepare_session(data: dict) -> dict:
+    """Shallow copy of the payload with the timeline reduced for rendering."""
+    timeline = data.get('timeline')
+    if not isinstance(timeline, list) or len(timeline) <= _timeline_config['max_points']:
+        return data
+    session = dict(data)
+    session['timeline'] = downsample_timeline(timeline)
+    return session
+
+
+def render_summary_html(data: dict) -> str:
+    """Render the session summary template to HTML."""
+    # With auto-reload on, get_template re-checks the file and recompiles only if it changed
+    tpl = _template_env.get_template(_template_config['name']) if _template_config['auto_reload'] else _summary_template
+    session = _prepare_session(data)
+    # The inline chart is only drawn when the client didn't send a timeline image
+    points = '' if session.get('timeline_png') else timeline_svg_points(session.get('timeline'))
+    return tpl.render(session=session, timeline_points=points, timeline_size=_timeline_config)
+
+
+def _template_version():
+    # Under auto-reload an edited template must not be served from the cache
+    if _template_config['auto_reload']:
+        try:
+            return os.path.getmtime(os.path.join(_template_config['dir'], _template_config['name']))
+        except OSError:
+            return 0
+    return _template_loaded_at
+
+
+_template_loaded_at = time.time()
+
+# Rendered PDF cache, keyed by a sha256 of the normalized session payload. Bounded by entry count
+# (`EXPORT_CACHE_SIZE`) and total size (`EXPORT_CACHE_MAX_MB`), evicting least-recently-used.
+_export_cache_config = {
+    'max_entries': max(0, int(os.environ.get('EXPORT_CACHE_SIZE', '32'))),
+    'max_bytes': max(0, int(float(os.environ.get('EXPORT_CACHE_MAX_MB', '64')) * 1024 * 1024)),
+}
+_export_cache = OrderedDict()
+_export_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+
+
+def export_cache_key(data: dict) -> str:
+    """Hash of the payload with keys sorted and no insignificant whitespace, plus the template version."""
+    normalized = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{_template_version()}|{normalized}".encode('utf-8')).hexdigest()
+
+
+def _export_cache_get(key):
+    pdf = _export_cache.get(key)
+    if pdf is None:
+        _export_cache_stats['misses'] += 1
+        return None
+    _export_cache.move_to_end(key)
+    _export_cache_stats['hits'] += 1
+    return pdf
+
+
+def _export_cache_put(key, pdf):
+    if _export_cache_config['max_entries'] == 0 or len(pdf) > _export_cache_config['max_bytes']:
+        return
+    if key in _export_cache:
+        return
+    _export_cache[key] = pdf
+    _export_cache_stats['bytes'] += len(pdf)
+    while (len(_export_cache) > _export_cache_config['max_entries']
+           or _export_cache_stats['bytes'] > _export_cache_config['max_bytes']):
+        _, evicted = _export_cache.popitem(last=False)
+        _export_cache_stats['bytes'] -= len(evicted)
+        _export_cache_stats['evictions'] += 1
+
+
+async def render_summary_pdf(data: dict):
+    """Render a session summary to PDF bytes. Returns (pdf, cache_hit).
+
+    Identical payloads are served from the cache, and concurrent exports of the same payload share one render.
+    """
+    key = export_cache_key(data)
+    pdf = _export_cache_get(key)
+    if pdf is not None:
+        return pdf, True
+
+    inflight = _state['inflight'].get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight), True
+
+    future = asyncio.get_running_loop().create_future()
+    _state['inflight'][key] = future
+    try:
+        pdf = await _render_pdf(render_summary_html(data))
+        _export_cache_put(key, pdf)
+        future.set_result(pdf)
+        return pdf, False
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # Mark retrieved so an unawaited failure isn't logged
+        raise
+    finally:
+        if not future.done():
+            future.cancel()
+        _state['inflight'].pop(key, None)
 
 
 @router.post("/api/export-summary")
@@ -73,136 +596,35 @@ async def export_summary(request: Request):
     safe_sid = re.sub(r'[^A-Za-z0-9_.-]', '_', sid_raw)[:128]
     logger.info("Export request received: session_id=%s safe=%s keys=%s", sid_raw, safe_sid, list(data.keys()))
 
-    # Render Jinja2 template with session data
-    templates_dir = os.path.join(os.path.dirname(__file__), 'templates')
-    env = Environment(loader=FileSystemLoader(templates_dir), autoescape=select_autoescape(['html', 'xml']))
-    # Helper filter: convert epoch-ms (number) to HH:MM:SS for compact timestamps in PDFs
-    def _fmt_time(ms):
-        """Strict formatter: accept ISO string or numeric epoch-ms and return HH:MM:SS, otherwise ''."""
-        if ms is None:
-            return ''
-        # ISO string
-        if isinstance(ms, str):
-            try:
-                dt = datetime.fromisoformat(ms.replace('Z', '+00:00'))
-                return dt.strftime('%H:%M:%S')
-            except Exception:
-                return ''
-        # numeric epoch-ms
-        if isinstance(ms, (int, float)):
-            try:
-                dt = datetime.fromtimestamp(float(ms) / 1000.0)
-                return dt.strftime('%H:%M:%S')
-            except Exception:
-                return ''
-        return ''
-
-    env.filters['fmt_time'] = _fmt_time
-    # Helper filter: format a full datetime for cover/title lines
-    def _fmt_datetime(val):
-        """Strict datetime formatter: accept ISO string or numeric epoch-ms and return friendly localized string, otherwise ''."""
-        if val is None:
-            return ''
-        if isinstance(val, str):
-            try:
-                dt = datetime.fromisoformat(val.replace('Z', '+00:00'))
-            except Exception:
-                return ''
-        else:
-            try:
-                dt = datetime.fromtimestamp(float(val) / 1000.0)
-            except Exception:
-                return ''
-        try:
-            dt_local = dt.astimezone()
-        except Exception:
-            dt_local = dt
-        return dt_local.strftime('%b %d, %Y, %I:%M %p')
-
-    env.filters['fmt_datetime'] = _fmt_datetime
-    # Helper filter: format a time offset (seconds or milliseconds) as MM:SS or H:MM:SS
-    def _fmt_offset(val):
-        """Format an offset in seconds or milliseconds to MM:SS or H:MM:SS. Accepts numeric or numeric string. No epoch fallbacks."""
-        if val is None:
-            return ''
-        try:
-            if isinstance(val, str):
-                v = float(val)
-            else:
-                v = float(val)
-        except Exception:
-            return ''
-
-        # Treat values >1000 as milliseconds
-        if v > 1000:
-            total_seconds = int(round(v / 1000.0))
-        else:
-            total_seconds = int(round(v))
-
-        hours, rem = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(rem, 60)
-        if hours:
-            return f"{hours}:{minutes:02d}:{seconds:02d}"
-        return f"{minutes:02d}:{seconds:02d}"
-
-    env.filters['fmt_offset'] = _fmt_offset
-    tpl = env.get_template('summary.html')
     try:
-        html = tpl.render(session=data)
-    except Exception as e:
-        tb = traceback.format_exc()
-        logger.exception("Template rendering failed for session %s", safe_sid)
-        return _error_response("template_render_failed", str(e), tb)
-
-    # Create a unique temporary file for the PDF using NamedTemporaryFile
-    tmpdir = tempfile.gettempdir()
-    try:
-        tmpf = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf', prefix=f"session_summary_{safe_sid}_", dir=tmpdir)
-        out_path = tmpf.name
-        tmpf.close()
-    except Exception as e:
-        tb = traceback.format_exc()
-        logger.exception("Failed to create temporary file for session %s", safe_sid)
-        return _error_response("tempfile_create_failed", str(e), tb)
-
-    logger.info("Rendering PDF for session %s -> %s", safe_sid, out_path)
-
-    try:
-        await _html_to_pdf(html, out_path)
-        # Return the file and schedule deletion after send
-        filename = f"summary_{safe_sid}.pdf"
-        logger.info("PDF render succeeded for session %s, returning %s", safe_sid, out_path)
-        return FileResponse(out_path, filename=filename, media_type='application/pdf', background=BackgroundTask(lambda p=out_path: _safe_remove(p)))
+        pdf, cache_hit = await render_summary_pdf(data)
     except Exception as e:
         tb = traceback.format_exc()
         logger.exception("Failed to render PDF for session %s: %s", safe_sid, str(e))
-        # Attempt to remove the temp file if it exists
-        try:
-            if os.path.exists(out_path):
-                os.remove(out_path)
-                logger.debug("Removed temporary file %s after failure", out_path)
-        except Exception:
-            logger.exception("Failed to remove temporary file %s", out_path)
-        # Surface error to stderr for developers
-        try:
-            sys.stderr.write(f"PDF RENDER ERROR session={safe_sid} path={out_path}\n")
-            sys.stderr.write(tb + "\n")
-            sys.stderr.flush()
-        except Exception:
-            pass
+        return _error_response("PDF rendering failed", str(e), tb)
 
-    msg = str(e)
-    return _error_response("PDF rendering failed", msg, tb)
+    logger.info("PDF %s for session %s (%d bytes)", "served from cache" if cache_hit else "rendered", safe_sid, len(pdf))
+    return Response(
+        content=pdf,
+        media_type='application/pdf',
+        headers={
+            "Content-Disposition": f'attachment; filename="summary_{safe_sid}.pdf"',
+            "X-Export-Cache": "hit" if cache_hit else "miss",
+        },
+    )
 
 
-def _safe_remove(path: str) -> None:
-    """Helper to remove a file and log any failures (used by BackgroundTask)."""
-    try:
-        if os.path.exists(path):
-            os.remove(path)
-            logger.info("Temporary file removed: %s", path)
-    except Exception:
-        logger.exception("Failed to remove temporary file: %s", path)
+@router.get("/api/export-summary/cache")
+async def export_cache_stats():
+    """Rendered PDF cache counters."""
+    lookups = _export_cache_stats['hits'] + _export_cache_stats['misses']
+    return {
+        **_export_cache_stats,
+        "size": len(_export_cache),
+        "max_entries": _export_cache_config['max_entries'],
+        "max_bytes": _export_cache_config['max_bytes'],
+        "hit_rate": round(_export_cache_stats['hits'] / lookups, 4) if lookups else 0.0,
+    }
 
 
 def _error_response(error_key: str, detail: str, tb: str, status: int = 500):
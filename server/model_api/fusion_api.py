@@ -1,7 +1,35 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, HTTPException
+import os
+import numpy as np
+
+from model_api import metrics_api
 
 router = APIRouter()
 
+FUSION_KEYS = ('face', 'voice', 'text')
+
+# Live fusion over /ws/audio. `FUSION_EWMA_ALPHA` sets the default smoothing weight of the newest
+# score (0 disables smoothing); clients can override it per session.
+_stream_config = {
+    'ewma_alpha': min(1.0, max(0.0, float(os.environ.get('FUSION_EWMA_ALPHA', '0')))),
+}
+
+
+def _modality_element(v):
+    """Deceptive score and presence of one [truth, lie] vector. All-zero or malformed vectors are absent."""
+    if not (isinstance(v, list) and len(v) > 1):
+        return 0.0, False
+    try:
+        score = float(v[1])
+    except Exception:
+        score = 0.0
+    try:
+        is_nonzero = any(float(x) != 0.0 for x in v)
+    except Exception:
+        is_nonzero = False
+    return score, is_nonzero
+
+
 def rule_based_fusion(modalities):
     # Consider only modalities that are provided in the request
     # Missing keys are treated as absent and excluded from normalization.
@@ -11,21 +39,10 @@ def rule_based_fusion(modalities):
     scores_map = {}
     present_keys = []
     for k in keys:
-        v = modalities.get(k)
-        if isinstance(v, list) and len(v) > 1:
-            try:
-                scores_map[k] = float(v[1])
-            except Exception:
-                scores_map[k] = 0.0
-            # Treat all-zero vector (e.g. [0,0]) as absent
-            try:
-                is_nonzero = any(float(x) != 0.0 for x in v)
-            except Exception:
-                is_nonzero = False
-            if is_nonzero:
-                present_keys.append(k)
-        else:
-            scores_map[k] = 0.0
+        # Treat all-zero vector (e.g. [0,0]) as absent
+        scores_map[k], is_nonzero = _modality_element(modalities.get(k))
+        if is_nonzero:
+            present_keys.append(k)
 
     # Average overall score over present modalities
     if len(present_keys) > 0:
@@ -44,9 +61,144 @@ def rule_based_fusion(modalities):
         'contributions': contributions
     }
 
+def voice_vector(emotion):
+    """[truth, lie] from voice emotion scores, grouped as the client does: neutral/happy vs angry/sad."""
+    return [emotion.get('neu', 0.0) + emotion.get('hap', 0.0), emotion.get('ang', 0.0) + emotion.get('sad', 0.0)]
+
+
+def text_vector(label, score):
+    """[truth, lie] from a text sentiment label and confidence, or None for any other label."""
+    label = str(label or "").lower()
+    score = float(score or 0.0)
+    if label == "truthful":
+        return [score, 1 - score]
+    if label == "deceptive":
+        return [1 - score, score]
+    return None
+
+
+class StreamingFusion:
+    """Latest vector per modality for one live session, fused with `rule_based_fusion` on every update.
+
+    With `alpha` > 0 the fused score is also smoothed with an exponentially weighted moving average;
+    the average restarts when no modality is present.
+    """
+
+    def __init__(self, alpha=0.0):
+        self.modalities = {}
+        self.alpha = alpha
+        self.smoothed = None
+        self.last_sent = None
+
+    def set_alpha(self, alpha):
+        self.alpha = min(1.0, max(0.0, float(alpha)))
+
+    def store(self, modality, vector):
+        """Keep a modality's latest [truth, lie] vector (None clears it) without fusing."""
+        if vector is None:
+            self.modalities.pop(modality, None)
+        else:
+            self.modalities[modality] = vector
+
+    def update(self, modality=None, vector=None):
+        """Store a modality's latest [truth, lie] vector (None clears it) and return the fused result."""
+        if modality is not None:
+            self.store(modality, vector)
+        with metrics_api.timer('fusion'):
+            result = rule_based_fusion(self.modalities)
+        score = result['score']
+        if score is None:
+            self.smoothed = None
+        elif self.alpha > 0 and self.smoothed is not None:
+            self.smoothed = self.alpha * score + (1 - self.alpha) * self.smoothed
+        else:
+            self.smoothed = score
+        result['smoothed_score'] = self.smoothed
+        return result
+
+    def message(self, result):
+        """`fusion` message for the result, or None if it is the same as the last one sent."""
+        message = {
+            "type": "fusion",
+            "score": result['score'],
+            "smoothed_score": result['smoothed_score'],
+            "contributions": result['contributions'],
+        }
+        if message == self.last_sent:
+            return None
+        self.last_sent = message
+        return message
+
+
 @router.post("/api/fusion-truthfulness")
 async def fusion_truthfulness(request: Request):
     data = await request.json()
     # Expecting: { 'face': [truth, lie], 'voice': [truth, lie], 'text': [truth, lie] }
-    result = rule_based_fusion(data)
-    return result
\ No newline at end of file
+    with metrics_api.timer('fusion'):
+        result = rule_based_fusion(data)
+    return result
+
+
+def _modality_column(values, n):
+    """Deceptive scores and presence mask for one modality across n steps."""
+    if values is None:
+        return np.zeros(n), np.zeros(n, dtype=bool)
+    # Fast path: a rectangular numeric array of [truth, lie, ...] rows
+    try:
+        arr = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        arr = None
+    if arr is not None and arr.ndim == 2 and arr.shape[1] > 1 and all(isinstance(v, list) for v in values):
+        return arr[:, 1].copy(), (arr != 0.0).any(axis=1)
+    # Ragged or partly missing steps: apply the single-snapshot rules per step
+    scores = np.zeros(n)
+    present = np.zeros(n, dtype=bool)
+    for i, v in enumerate(values):
+        scores[i], present[i] = _modality_element(v)
+    return scores, present
+
+
+def fuse_series(series):
+    """Vectorized `rule_based_fusion` over aligned per-step modality vectors.
+
+    `series` maps each modality to a list with one [truth, lie] vector (or null) per step; a missing key means
+    the modality is absent at every step.
+    """
+    present_keys = [k for k in FUSION_KEYS if series.get(k) is not None]
+    if any(not isinstance(series[k], list) for k in present_keys):
+        raise ValueError("Each modality must be a list of per-step vectors")
+    lengths = {k: len(series[k]) for k in present_keys}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f"Modality series have different lengths: {lengths}")
+    n = next(iter(lengths.values()), 0)
+
+    scores = np.zeros((len(FUSION_KEYS), n))
+    present = np.zeros((len(FUSION_KEYS), n), dtype=bool)
+    for row, k in enumerate(FUSION_KEYS):
+        scores[row], present[row] = _modality_column(series.get(k), n)
+
+    count = present.sum(axis=0)
+    total = np.where(present, scores, 0.0).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg = total / count
+        share = np.where(present, 1.0 / count, 0.0)
+
+    return {
+        'scores': [float(a) if c else None for a, c in zip(avg, count)],
+        'used_modalities': list(FUSION_KEYS),
+        'contributions': {k: share[row].tolist() for row, k in enumerate(FUSION_KEYS)},
+    }
+
+
+@router.post("/api/fusion-truthfulness/series")
+async def fusion_truthfulness_series(request: Request):
+    data = await request.json()
+    # Expecting: { 'face': [[truth, lie], ...], 'voice': [...], 'text': [...] }, one entry per step
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Expected an object of modality series")
+    with metrics_api.timer('fusion'):
+        try:
+            result = fuse_series(data)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return result
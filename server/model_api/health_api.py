@@ -0,0 +1,138 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+import os
+import time
+import logging
+import asyncio
+from functools import partial
+import numpy as np
+
+from model_api import text_api as text_api_module
+from model_api import voice_api as voice_api_module
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# The deep probe runs real inference at most once per `HEALTH_DEEP_INTERVAL_SECONDS`; calls in between
+# get the cached result.
+_health_config = {
+    'deep_interval_seconds': max(1.0, float(os.environ.get('HEALTH_DEEP_INTERVAL_SECONDS', '30'))),
+}
+
+_state = {
+    'deep_result': None,
+    'deep_checked_at': 0.0,
+    'deep_task': None,
+    'load_task': None,
+}
+
+
+def model_status():
+    """Load state of each model, read from module state only. Never waits on or starts model loading."""
+    return {
+        "text": {
+            "loaded": text_api_module._state.get('model') is not None,
+            "loading": text_api_module._state['init_lock'].locked(),
+            "model_id": text_api_module._state.get('model_id'),
+        },
+        "voice_emotion": {
+            "loaded": voice_api_module._state.get('emotion_pipe') is not None,
+            "loading": voice_api_module._state['init_lock'].locked(),
+            "backend": voice_api_module._state.get('emotion_backend'),
+        },
+        "vosk": {
+            "loaded": voice_api_module._state.get('vosk_model') is not None,
+            "loading": voice_api_module._state['init_lock'].locked(),
+        },
+    }
+
+
+async def _deep_probe():
+    """One inference through each loaded model, timed."""
+    checks = {}
+    start_time = time.time()
+    try:
+        # Straight to the pipeline with errors raised; the live path falls back to neutral scores on failure
+        await asyncio.get_running_loop().run_in_executor(
+            voice_api_module._get_emotion_executor(),
+            partial(voice_api_module.analyze_emotion_batch, [np.zeros(1000, dtype=np.float32)], 16000, raise_errors=True),
+        )
+        checks["voice_emotion"] = {"ok": True, "seconds": round(time.time() - start_time, 4)}
+    except Exception as e:
+        checks["voice_emotion"] = {"ok": False, "error": str(e)}
+
+    start_time = time.time()
+    try:
+        # Straight to the model, bypassing the prediction cache
+        await asyncio.to_thread(text_api_module._predict_batch, ["health check"])
+        checks["text"] = {"ok": True, "seconds": round(time.time() - start_time, 4)}
+    except Exception as e:
+        checks["text"] = {"ok": False, "error": str(e)}
+
+    return {
+        "status": "healthy" if all(c["ok"] for c in checks.values()) else "unhealthy",
+        "checks": checks,
+        "checked_at": time.time(),
+    }
+
+
+@router.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+def _start_model_loading(app):
+    """Load missing models in the background. With lazy loading (`PRELOAD_MODELS=0`) nothing else would
+    start them before the first request, so the readiness probe does; failed loads are retried on the next probe."""
+    task = _state['load_task']
+    if task is not None and not task.done():
+        return
+    _state['load_task'] = asyncio.gather(
+        text_api_module.init_text_model(app), voice_api_module.init_voice_models(app), return_exceptions=True
+    )
+
+
+@router.get("/health/ready")
+async def health_ready(request: Request):
+    """Readiness: 200 once every model is loaded, 503 while any is missing or still loading.
+
+    A probe that finds models missing starts loading them in the background.
+    """
+    models = model_status()
+    ready = all(m["loaded"] for m in models.values())
+    if not ready:
+        _start_model_loading(request.app)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "models": models},
+    )
+
+
+@router.get("/health/deep")
+async def health_deep():
+    """Inference probe through the loaded models, run at most once per interval and cached in between."""
+    models = model_status()
+    if not all(m["loaded"] for m in models.values()):
+        return JSONResponse(status_code=503, content={"status": "not_ready", "models": models})
+
+    now = time.time()
+    if _state['deep_result'] is None or now - _state['deep_checked_at'] >= _health_config['deep_interval_seconds']:
+        # Concurrent probes share one run
+        task = _state['deep_task']
+        if task is None or task.done():
+            task = asyncio.ensure_future(_deep_probe())
+            _state['deep_task'] = task
+        try:
+            _state['deep_result'] = await asyncio.shield(task)
+        except Exception as e:
+            logger.warning(f"Deep health probe failed: {e}")
+            _state['deep_result'] = {"status": "unhealthy", "error": str(e), "checked_at": now}
+        _state['deep_checked_at'] = _state['deep_result']["checked_at"]
+
+    result = _state['deep_result']
+    return JSONResponse(
+        status_code=200 if result["status"] == "healthy" else 503,
+        content={**result, "cached_seconds": round(time.time() - result["checked_at"], 2)},
+    )
@@ -0,0 +1,284 @@
+from fastapi import APIRouter, Request, UploadFile, File, Form, HTTPException
+from fastapi.responses import Response, StreamingResponse
+import os
+import time
+import uuid
+import json
+import logging
+import asyncio
+
+from model_api import analysis_api as analysis_api_module
+from model_api import export_api as export_api_module
+
+router = APIRouter()
+
+logger = logging.getLogger(__name__)
+
+# Background job settings. Finished jobs are kept for `JOB_TTL_SECONDS` so clients can fetch the result,
+# but at most `JOB_MAX_FINISHED` of them holding at most `JOB_MAX_RESULT_MB` of PDF output; beyond that
+# the oldest finished jobs are dropped first.
+_job_config = {
+    'queue_size': max(1, int(os.environ.get('JOB_QUEUE_SIZE', '16'))),
+    'ttl_seconds': max(1.0, float(os.environ.get('JOB_TTL_SECONDS', '3600'))),
+    'max_finished': max(1, int(os.environ.get('JOB_MAX_FINISHED', '200'))),
+    'max_result_bytes': int(max(1.0, float(os.environ.get('JOB_MAX_RESULT_MB', '256'))) * 1024 * 1024),
+    'progress_interval': 0.25,  # Minimum seconds between streamed progress events per job
+}
+
+
+async def _run_analysis(job, payload):
+    raw, sample_rate, session_id = payload
+    return await analysis_api_module.analyze_recording(
+        raw, sample_rate, session_id, job['app'], progress=job['progress']
+    )
+
+
+async def _run_export(job, payload):
+    job['progress'](0.1, "rendering")
+    pdf, _ = await export_api_module.render_summary_pdf(payload)
+    return pdf
+
+
+# Job types: handler plus how many jobs of that type may run at once
+JOB_TYPES = {
+    'analyze-recording': {
+        'handler': _run_analysis,
+        'concurrency': max(1, int(os.environ.get('JOB_ANALYZE_CONCURRENCY', '1'))),
+    },
+    'export-summary': {
+        'handler': _run_export,
+        'concurrency': max(1, int(os.environ.get('JOB_EXPORT_CONCURRENCY', '2'))),
+    },
+}
+
+_state = {
+    'jobs': {},      # job id -> job dict
+    'queues': {},    # job type -> asyncio.Queue
+    'workers': {},   # job type -> list of worker tasks
+    'loop': None,
+}
+
+
+def _public(job):
+    """Job fields safe to return to clients."""
+    return {
+        "id": job['id'],
+        "type": job['type'],
+        "status": job['status'],
+        "progress": round(job['progress_value'], 4),
+        "stage": job['stage'],
+        "partial": job['partial'],
+        "error": job['error'],
+        "created": job['created'],
+        "started": job['started'],
+        "finished": job['finished'],
+    }
+
+
+def _publish(job, event):
+    """Push an event to every SSE subscriber of the job. Runs on the event loop."""
+    for q in list(job['subscribers']):
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+
+def _make_progress(job, loop):
+    """Progress callback for handlers. May be called from worker threads."""
+    def update(fraction, stage, partial=None):
+        job['progress_value'] = max(job['progress_value'], float(fraction))
+        job['stage'] = stage
+        if partial:
+            job['partial'].update(partial)
+        now = time.monotonic()
+        # Throttle frequent updates (per-chunk transcription progress), but always send partial results
+        if not partial and now - job['last_event'] < _job_config['progress_interval']:
+            return
+        job['last_event'] = now
+        event = {"event": "progress", "data": {"progress": round(job['progress_value'], 4), "stage": stage, "partial": partial}}
+        try:
+            loop.call_soon_threadsafe(_publish, job, event)
+        except RuntimeError:
+            pass  # Loop closed
+    return update
+
+
+def _result_bytes(job):
+    return len(job['result']) if isinstance(job['result'], (bytes, bytearray)) else 0
+
+
+def _prune_jobs():
+    """Drop finished jobs past their TTL, then the oldest finished jobs beyond the count and size bounds."""
+    now = time.time()
+    ttl = _job_config['ttl_seconds']
+    for job_id in [j for j, job in _state['jobs'].items() if job['finished'] and now - job['finished'] > ttl]:
+        _state['jobs'].pop(job_id, None)
+
+    finished = sorted((job for job in _state['jobs'].values() if job['finished']), key=lambda job: job['finished'])
+    total_bytes = sum(_result_bytes(job) for job in finished)
+    excess = len(finished) - _job_config['max_finished']
+    # The newest finished job is always kept, so its client can still fetch an oversized result
+    for job in finished[:-1]:
+        over_count = excess > 0
+        over_bytes = total_bytes > _job_config['max_result_bytes'] and _result_bytes(job) > 0
+        if not over_count and not over_bytes:
+            continue
+        _state['jobs'].pop(job['id'], None)
+        excess -= 1
+        total_bytes -= _result_bytes(job)
+
+
+async def _job_worker(job_type, queue):
+    handler = JOB_TYPES[job_type]['handler']
+    while True:
+        job, payload = await queue.get()
+        job['status'] = "running"
+        job['started'] = time.time()
+        _publish(job, {"event": "status", "data": _public(job)})
+        try:
+            job['result'] = await handler(job, payload)
+            job['status'] = "done"
+            job['progress_value'] = 1.0
+        except Exception as e:
+            logger.exception(f"Job {job['id']} ({job_type}) failed")
+            job['status'] = "failed"
+            job['error'] = str(e)
+        finally:
+            job['finished'] = time.time()
+            _publish(job, {"event": job['status'], "data": _public(job)})
+            queue.task_done()
+            _prune_jobs()
+
+
+def _ensure_workers():
+    """Start the per-type queues and workers on first use (and again if the event loop changed)."""
+    loop = asyncio.get_running_loop()
+    if _state['loop'] is loop:
+        return
+    _state['loop'] = loop
+    _state['queues'] = {}
+    _state['workers'] = {}
+    for job_type, spec in JOB_TYPES.items():
+        queue = asyncio.Queue(maxsize=_job_config['queue_size'])
+        _state['queues'][job_type] = queue
+        _state['workers'][job_type] = [
+            loop.create_task(_job_worker(job_type, queue)) for _ in range(spec['concurrency'])
+        ]
+
+
+def submit_job(job_type, payload, app=None):
+    """Queue a job and return its public record. Raises HTTP 429 when the queue for that type is full."""
+    _ensure_workers()
+    _prune_jobs()
+    job = {
+        'id': uuid.uuid4().hex,
+        'type': job_type,
+        'status': "queued",
+        'progress_value': 0.0,
+        'stage': "queued",
+        'partial': {},
+        'result': None,
+        'error': None,
+        'created': time.time(),
+        'started': None,
+        'finished': None,
+        'subscribers': set(),
+        'last_event': 0.0,
+        'app': app,
+    }
+    job['progress'] = _make_progress(job, asyncio.get_running_loop())
+    try:
+        _state['queues'][job_type].put_nowait((job, payload))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=429, detail=f"Too many queued {job_type} jobs, try again later")
+    _state['jobs'][job['id']] = job
+    logger.info(f"Job {job['id']} ({job_type}) queued")
+    return _public(job)
+
+
+def _get_job(job_id):
+    _prune_jobs()
+    job = _state['jobs'].get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+
+@router.post("/api/jobs/analyze-recording", status_code=202)
+async def submit_analysis(
+    request: Request,
+    file: UploadFile = File(...),
+    sample_rate: int = Form(analysis_api_module.SAMPLE_RATE),
+    session_id: str = Form(None),
+):
+    """Queue an offline recording analysis. Poll `/api/jobs/{id}` or stream `/api/jobs/{id}/events`."""
+    raw = await file.read()
+    if not raw:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    return submit_job('analyze-recording', (raw, sample_rate, session_id), request.app)
+
+
+@router.post("/api/jobs/export-summary", status_code=202)
+async def submit_export(request: Request):
+    """Queue a PDF export. Takes the same JSON body as `/api/export-summary`."""
+    data = await request.json()
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    return submit_job('export-summary', data, request.app)
+
+
+@router.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    return _public(_get_job(job_id))
+
+
+@router.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Server-sent events: current status, then progress (with partial results) until the job finishes."""
+    job = _get_job(job_id)
+    queue = asyncio.Queue(maxsize=256)
+
+    async def stream():
+        job['subscribers'].add(queue)
+        try:
+            yield f"event: status\ndata: {json.dumps(_public(job))}\n\n"
+            if job['finished']:
+                yield f"event: {job['status']}\ndata: {json.dumps(_public(job))}\n\n"
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                if event['event'] in ("done", "failed"):
+                    return
+        finally:
+            job['subscribers'].discard(queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/api/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    """Finished job output: the session JSON for analyses, the PDF for exports."""
+    job = _get_job(job_id)
+    if job['status'] == "failed":
+        raise HTTPException(status_code=500, detail=job['error'] or "Job failed")
+    if job['status'] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job['type'] == 'export-summary':
+        return Response(
+            content=job['result'],
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="session_summary_{job_id[:8]}.pdf"'},
+        )
+    return job['result']
@@ -0,0 +1,170 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+
+router = APIRouter()
+
+# Pipeline stages with a latency histogram. Observations for unknown stages are added on first use.
+STAGES = (
+    'decode',
+    'vad',
+    'preprocess',         # Bandpass and pre-emphasis of each incoming chunk
+    'preprocess_window',  # Noise gate and normalization of each emotion window
+    'emotion',
+    'vosk_accept',
+    'text_tokenize',
+    'text_infer',
+    'fusion',
+    'pdf_render',
+)
+
+# Upper bounds of the latency buckets, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Histogram:
+    """Per-bucket latency counts plus total count and sum. Safe to observe from executor threads."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+    @staticmethod
+    def quantile(q, buckets, counts, count):
+        """Estimate a quantile by linear interpolation inside the bucket that contains it."""
+        if count == 0:
+            return None
+        rank = q * count
+        seen = 0
+        lower = 0.0
+        for upper, n in zip(buckets, counts):
+            if seen + n >= rank and n > 0:
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        # Falls in the +Inf bucket; the largest finite bound is the best estimate
+        return buckets[-1]
+
+
+_histograms = {stage: Histogram() for stage in STAGES}
+_histograms_lock = threading.Lock()
+
+_gauges = {'ws_sessions': 0}
+
+
+def observe(stage, seconds):
+    """Record one latency observation for a pipeline stage."""
+    hist = _histograms.get(stage)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(stage, Histogram())
+    hist.observe(seconds)
+
+
+@contextmanager
+def timer(stage):
+    """Time the enclosed block into the stage histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def gauge_add(name, delta):
+    _gauges[name] = _gauges.get(name, 0) + delta
+
+
+def _model_state():
+    # Imported here because both modules import this one.
+    from model_api import text_api, voice_api
+    return {
+        'text': text_api._state.get('model') is not None,
+        'voice_emotion': voice_api._state.get('emotion_pipe') is not None,
+        'vosk': voice_api._state.get('vosk_model') is not None,
+    }
+
+
+def _fmt(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+
+def _prometheus_text():
+    lines = [
+        "# HELP pipeline_stage_seconds Latency of each pipeline stage.",
+        "# TYPE pipeline_stage_seconds histogram",
+    ]
+    for stage, hist in sorted(_histograms.items()):
+        counts, count, total = hist.snapshot()
+        cumulative = 0
+        for upper, n in zip(hist.buckets + (float('inf'),), counts):
+            cumulative += n
+            lines.append(f'pipeline_stage_seconds_bucket{{stage="{stage}",le="{_fmt(upper)}"}} {cumulative}')
+        lines.append(f'pipeline_stage_seconds_sum{{stage="{stage}"}} {_fmt(total)}')
+        lines.append(f'pipeline_stage_seconds_count{{stage="{stage}"}} {count}')
+
+    lines += [
+        "# HELP pipeline_stage_seconds_estimate Quantiles estimated from the stage histogram buckets.",
+        "# TYPE pipeline_stage_seconds_estimate gauge",
+    ]
+    for stage, hist in sorted(_histograms.items()):
+        counts, count, _ = hist.snapshot()
+        for q in QUANTILES:
+            value = Histogram.quantile(q, hist.buckets, counts, count)
+            if value is not None:
+                lines.append(f'pipeline_stage_seconds_estimate{{stage="{stage}",quantile="{q}"}} {_fmt(value)}')
+
+    lines += [
+        "# HELP ws_sessions_active Live /ws/audio sessions.",
+        "# TYPE ws_sessions_active gauge",
+        f"ws_sessions_active {_gauges.get('ws_sessions', 0)}",
+        "# HELP model_loaded Whether each model is loaded (1) or not (0).",
+        "# TYPE model_loaded gauge",
+    ]
+    for name, loaded in _model_state().items():
+        lines.append(f'model_loaded{{model="{name}"}} {int(loaded)}')
+    return "\n".join(lines) + "\n"
+
+
+def _json_metrics():
+    stages = {}
+    for stage, hist in sorted(_histograms.items()):
+        counts, count, total = hist.snapshot()
+        stages[stage] = {
+            "count": count,
+            "sum": round(total, 6),
+            "buckets": {_fmt(upper): n for upper, n in zip(hist.buckets + (float('inf'),), counts)},
+            "quantiles": {str(q): Histogram.quantile(q, hist.buckets, counts, count) for q in QUANTILES},
+        }
+    return {
+        "stages": stages,
+        "gauges": {"ws_sessions_active": _gauges.get('ws_sessions', 0)},
+        "models_loaded": _model_state(),
+    }
+
+
+@router.get("/metrics")
+async def metrics(request: Request):
+    """Stage latency histograms and gauges in Prometheus text format, or JSON with `?format=json`."""
+    if request.query_params.get('format') == 'json':
+        return _json_metrics()
+    return PlainTextResponse(_prometheus_text(), media_type="text/plain; version=0.0.4")
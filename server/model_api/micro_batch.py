@@ -0,0 +1,94 @@
+"""Micro-batching shared by the text and voice emotion models.
+
+Callers submit one item at a time. Items arriving within `max_wait_ms` of each other are handed to the
+model together, up to `max_batch_size` per batch, and each caller gets back its own result.
+"""
+import asyncio
+
+
+class MicroBatcher:
+    """Queue items from concurrent callers and process them in batches.
+
+    `process(items)` is a coroutine returning one result per item, in order; a result that is an
+    exception is raised to that item's caller only. `config` is read at batch time for `max_batch_size`
+    and `max_wait_ms`. Up to `concurrency` batches run at once, so the next batch collects while
+    earlier ones run.
+    """
+
+    def __init__(self, process, config, concurrency=1):
+        self.process = process
+        self.config = config
+        self.concurrency = concurrency
+        self._queue = None
+        self._worker = None
+        self._loop = None
+        # References to running batches, so they are not garbage collected mid-flight
+        self._tasks = set()
+
+    def _ensure_worker(self):
+        # The queue and worker belong to the running event loop; recreate them if the loop changed.
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._loop = loop
+            self._tasks = set()
+            self._worker = loop.create_task(self._run_worker())
+
+    async def submit(self, item):
+        """Queue one item and wait for its result."""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run_batch(self, batch, slots):
+        try:
+            try:
+                results = await self.process([item for item, _ in batch])
+            except Exception as e:
+                for _, f in batch:
+                    if not f.done():
+                        f.set_exception(e)
+                return
+            for (_, f), result in zip(batch, results):
+                if f.done():
+                    continue
+                if isinstance(result, Exception):
+                    f.set_exception(result)
+                else:
+                    f.set_result(result)
+        finally:
+            slots.release()
+
+    async def _run_worker(self):
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            batch = [await queue.get()]
+            await slots.acquire()
+
+            # Keep collecting until the batch is full or the wait window closes.
+            deadline = loop.time() + self.config['max_wait_ms'] / 1000.0
+            while len(batch) < self.config['max_batch_size']:
+                try:
+                    batch.append(queue.get_nowait())
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Drop callers that went away while waiting
+            batch = [(item, f) for item, f in batch if not f.done()]
+            if not batch:
+                slots.release()
+                continue
+            task = loop.create_task(self._run_batch(batch, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
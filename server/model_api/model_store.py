@@ -0,0 +1,72 @@
+"""Local model artifact store.
+
+Hugging Face models are exported once to `MODEL_CACHE_DIR` as safetensors, together with their tokenizer or
+feature extractor. Later startups load them from that directory: no hub resolution, so startup works
+offline, and safetensors weights are memory-mapped instead of read into a temporary copy.
+
+Export every model the server uses (run from the server directory, with network access):
+    python -m model_api.model_store
+"""
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_store_config = {
+    'dir': os.environ.get(
+        'MODEL_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'artifacts')
+    ),
+}
+
+
+def artifact_dir(repo):
+    """Directory of a repo's exported artifacts, e.g. superb/hubert-large-superb-er -> superb--hubert-large-superb-er."""
+    return os.path.join(_store_config['dir'], repo.replace('/', '--'))
+
+
+def has_artifact(repo):
+    path = artifact_dir(repo)
+    return os.path.isfile(os.path.join(path, 'config.json')) and os.path.isfile(os.path.join(path, 'model.safetensors'))
+
+
+def resolve(repo):
+    """Where to load a model from, and the matching `from_pretrained` options.
+
+    Returns the local artifact directory (local files only) when the repo was exported, else the hub repo id.
+    """
+    if has_artifact(repo):
+        return artifact_dir(repo), {'local_files_only': True}
+    logger.info(f"No local artifact for {repo} in {_store_config['dir']}, loading from the Hugging Face hub")
+    return repo, {}
+
+
+def export_artifact(repo, model_cls, processor_cls):
+    """Download a repo once and save the model as safetensors plus its tokenizer/feature extractor."""
+    path = artifact_dir(repo)
+    start_time = time.time()
+    model = model_cls.from_pretrained(repo)
+    model.save_pretrained(path, safe_serialization=True)
+    processor_cls.from_pretrained(repo).save_pretrained(path)
+    logger.info(f"Exported {repo} to {path} in {time.time() - start_time:.2f}s")
+    return path
+
+
+def export_all():
+    """Export the text model and every registered voice emotion backend."""
+    from transformers import (
+        AutoFeatureExtractor,
+        AutoModelForAudioClassification,
+        DistilBertForSequenceClassification,
+        DistilBertTokenizerFast,
+    )
+    from model_api import text_api, voice_api
+
+    export_artifact(text_api.TEXT_MODEL_REPO, DistilBertForSequenceClassification, DistilBertTokenizerFast)
+    for repo in sorted({backend['model'] for backend in voice_api.VOICE_EMOTION_BACKENDS.values()}):
+        export_artifact(repo, AutoModelForAudioClassification, AutoFeatureExtractor)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    export_all()
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Request, HTTPException
 import time
 import logging
 import os
 import asyncio
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from model_api import metrics_api
+from model_api import micro_batch
+from model_api import model_store
 
 router = APIRouter()
 
@@ -10,13 +16,94 @@ router = APIRouter()
 _state = {
     'tokenizer': None,
     'model': None,
+    'engine': None,
+    'model_id': None,
+    'model_generation': 0,
     'device': None,
     'temperature': 1.2343440055847168,
     'init_lock': asyncio.Lock()
 }
 
+# Micro-batching settings. Requests arriving within `TEXT_BATCH_WAIT_MS` of each other
+# are scored together in one forward pass, up to `TEXT_BATCH_MAX_SIZE` texts per pass.
+_batch_config = {
+    'max_batch_size': max(1, int(os.environ.get('TEXT_BATCH_MAX_SIZE', '16'))),
+    'max_wait_ms': max(0.0, float(os.environ.get('TEXT_BATCH_WAIT_MS', '10'))),
+    # Rows per forward pass for the bulk endpoint.
+    'bulk_batch_size': max(1, int(os.environ.get('TEXT_BULK_BATCH_SIZE', '32')))
+}
+
+TEXT_MODEL_REPO = "damiangohrh123/deception-detector"
+
+# Max token length is 256.
+MAX_LENGTH = 256
+
+# Prediction cache. Results are keyed by whitespace-normalized text, model id and temperature,
+# kept for `TEXT_CACHE_TTL_SECONDS` and evicted least-recently-used beyond `TEXT_CACHE_SIZE` entries.
+_cache_config = {
+    'max_entries': max(0, int(os.environ.get('TEXT_CACHE_SIZE', '4096'))),
+    'ttl_seconds': max(0.0, float(os.environ.get('TEXT_CACHE_TTL_SECONDS', '3600')))
+}
+_cache = OrderedDict()
+_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expired': 0}
+
+# Inference engine selected by `TEXT_INFERENCE_ENGINE`:
+#   eager  - fp32 PyTorch model (default)
+#   int8   - dynamically quantized int8 Linear layers (CPU only)
+#   traced - TorchScript graph traced and frozen at load time
+TEXT_ENGINES = ('eager', 'int8', 'traced')
+
 logger = logging.getLogger(__name__)
 
+def _load_text_model():
+    """Load the tokenizer and model, build the inference engine and warm it up. Runs in a worker thread."""
+    # Import transformers and torch lazily to avoid import-time overhead for tests.
+    from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
+    import torch
+
+    start_time = time.time()
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    # Exported safetensors artifacts load memory-mapped and without hub lookups
+    source, options = model_store.resolve(TEXT_MODEL_REPO)
+    tokenizer = DistilBertTokenizerFast.from_pretrained(source, **options)
+    model = DistilBertForSequenceClassification.from_pretrained(source, **options)
+    model.to(device)
+    model.eval()
+
+    # limit threads
+    try:
+        max_threads = min(4, os.cpu_count() or 1)
+        torch.set_num_threads(max_threads)
+    except Exception:
+        pass
+
+    engine = os.environ.get('TEXT_INFERENCE_ENGINE', 'eager').strip().lower()
+    try:
+        engine_model = build_text_engine(model, tokenizer, engine, device)
+    except Exception as e:
+        logger.warning(f"Text inference engine '{engine}' unavailable, falling back to eager: {e}")
+        engine, engine_model = 'eager', model
+
+    # Run a dummy input once to ensure first real request is not slow.
+    try:
+        warmup_inputs = tokenizer(
+            "warmup",
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=8
+        )
+        warmup_inputs = {k: v.to(device) for k, v in warmup_inputs.items()}
+        with torch.no_grad():
+            _ = engine_model(**warmup_inputs).logits
+    except Exception:
+        logger.info("Text model warmup skipped or failed (non-fatal)")
+
+    # Only the engine model is kept; with int8 the fp32 weights are freed once this returns
+    return tokenizer, engine_model, engine, device, time.time() - start_time
+
+
 # Initialize model and tokenizer. Uses an async lock to ensure thread-safety.
 async def init_text_model(app=None):
     # If already initialized, return immediately
@@ -28,79 +115,235 @@ async def init_text_model(app=None):
         if _state['model'] is not None and _state['tokenizer'] is not None:
             return
         try:
-            # Import transformers and torch lazily to avoid import-time overhead for tests.
-            from transformers import DistilBertTokenizerFast, DistilBertForSequenceClassification
-            import torch
-
-            model_repo = "damiangohrh123/deception-detector"
-
-            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-            tokenizer = DistilBertTokenizerFast.from_pretrained(model_repo)
-            model = DistilBertForSequenceClassification.from_pretrained(model_repo)
-            model.to(device)
-            model.eval()
-
-            # limit threads
-            try:
-                max_threads = min(4, os.cpu_count() or 1)
-                torch.set_num_threads(max_threads)
-            except Exception:
-                pass
-
-            # Run a dummy input once to ensure first real request is not slow.
-            try:
-                warmup_inputs = tokenizer(
-                    "warmup",
-                    return_tensors="pt",
-                    truncation=True,
-                    padding=True,
-                    max_length=8
-                )
-                warmup_inputs = {k: v.to(device) for k, v in warmup_inputs.items()}
-                with torch.no_grad():
-                    _ = model(**warmup_inputs).logits
-            except Exception:
-                logger.info("Text model warmup skipped or failed (non-fatal)")
+            # Loading runs in a thread so the event loop (and other models' loading) keeps going
+            tokenizer, engine_model, engine, device, load_time = await asyncio.to_thread(_load_text_model)
 
             _state['tokenizer'] = tokenizer
-            _state['model'] = model
+            _state['model'] = engine_model
+            _state['engine'] = engine
             _state['device'] = device
+            # A new model generation makes every cached prediction unreachable; drop them.
+            _state['model_generation'] += 1
+            _state['model_id'] = f"{TEXT_MODEL_REPO}:{engine}:{_state['model_generation']}"
+            _cache.clear()
 
             if app is not None:
                 try:
                     app.state.text_model_loaded = True
                 except Exception:
                     pass
-            logger.info(f"Text model initialized on device={device}")
+            logger.info(f"Text model initialized on device={device} engine={engine} in {load_time:.2f}s")
         except Exception as e:
             logger.exception("Failed to initialize text model: %s", e)
 
 
+class _TracedTextModel:
+    """Adapts a traced logits-only graph to the `model(**inputs).logits` call used by eager models."""
+
+    def __init__(self, traced):
+        self.traced = traced
+
+    def __call__(self, input_ids, attention_mask, **_):
+        return SimpleNamespace(logits=self.traced(input_ids, attention_mask))
+
+
+def build_text_engine(model, tokenizer, engine, device):
+    """Wrap a loaded fp32 model in the requested inference engine."""
+    import torch
+
+    if engine == 'eager':
+        return model
+
+    if engine == 'int8':
+        # Dynamic quantization kernels are CPU-only
+        if device.type != 'cpu':
+            raise RuntimeError("int8 engine requires CPU")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if engine == 'traced':
+        class LogitsOnly(torch.nn.Module):
+            def __init__(self, inner):
+                super().__init__()
+                self.inner = inner
+
+            def forward(self, input_ids, attention_mask):
+                return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+
+        # Trace with a padded two-row batch; sequence length stays dynamic in the graph.
+        example = tokenizer(
+            ["warmup", "a slightly longer warmup sentence"],
+            return_tensors='pt',
+            padding=True
+        )
+        example = {k: v.to(device) for k, v in example.items()}
+        with torch.no_grad():
+            traced = torch.jit.trace(
+                LogitsOnly(model).eval(), (example['input_ids'], example['attention_mask']), strict=False
+            )
+            traced = torch.jit.freeze(traced)
+            try:
+                traced = torch.jit.optimize_for_inference(traced)
+            except Exception:
+                logger.info("TorchScript optimize_for_inference skipped (non-fatal)")
+        return _TracedTextModel(traced)
+
+    raise ValueError(f"Unknown text inference engine '{engine}', expected one of {TEXT_ENGINES}")
+
+
+def _cache_key(text):
+    # Keyed on the model generation too, so results from a previous model are never served.
+    return (" ".join(text.split()), _state.get('model_id'), _get_temperature())
+
+
+def _cache_get(key):
+    entry = _cache.get(key)
+    if entry is None:
+        _cache_stats['misses'] += 1
+        return None
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        del _cache[key]
+        _cache_stats['expired'] += 1
+        _cache_stats['misses'] += 1
+        return None
+    _cache.move_to_end(key)
+    _cache_stats['hits'] += 1
+    return result
+
+
+def _cache_put(key, result):
+    # Skip results computed for a model that has since been replaced.
+    if _cache_config['max_entries'] == 0 or key[1] != _state.get('model_id'):
+        return
+    _cache[key] = (time.monotonic() + _cache_config['ttl_seconds'], result)
+    _cache.move_to_end(key)
+    while len(_cache) > _cache_config['max_entries']:
+        _cache.popitem(last=False)
+        _cache_stats['evictions'] += 1
+
+
+def cache_stats():
+    """Hit/miss counters and size of the text prediction cache."""
+    lookups = _cache_stats['hits'] + _cache_stats['misses']
+    return {
+        **_cache_stats,
+        "size": len(_cache),
+        "max_entries": _cache_config['max_entries'],
+        "ttl_seconds": _cache_config['ttl_seconds'],
+        "hit_rate": round(_cache_stats['hits'] / lookups, 4) if lookups else 0.0,
+        "model_id": _state.get('model_id')
+    }
+
+
 def _map_label(predicted_label: int):
     return "truthful" if int(predicted_label) == 0 else "deceptive"
 
 
-@router.post("/api/text-sentiment")
-async def text_sentiment(request: Request):
+def _get_temperature():
+    # Temperature used for calibration. Falls back to 1.0 when unset or invalid.
+    try:
+        t = float(_state.get('temperature', 1.0))
+        if t <= 0.0:
+            t = 1.0
+    except Exception:
+        t = 1.0
+    return t
+
+
+def _forward(inputs):
+    """Run one no_grad forward pass over padded inputs and return a calibrated result per row."""
+    import torch
+    device = _state['device']
+    model = _state['model']
+
+    # Move tensors to device (CPU or GPU).
+    inputs = {k: v.to(device) for k, v in inputs.items()}
+    with torch.no_grad():
+        logits = model(**inputs).logits
+        # Apply temperature calibration
+        probs = torch.softmax(logits / _get_temperature(), dim=1)
+    confidences, predicted = torch.max(probs, dim=1)
+    return [
+        {"label": _map_label(label), "score": float(conf)}
+        for label, conf in zip(predicted.tolist(), confidences.tolist())
+    ]
+
+
+def _predict_batch(texts):
+    """Score a list of texts in one padded forward pass. Returns (results, tokenize_time, inference_time)."""
+    tokenizer = _state['tokenizer']
+
+    # Tokenize all texts together, padded to the longest text in the batch.
+    tokenize_start = time.time()
+    inputs = tokenizer(
+        texts,
+        return_tensors='pt',
+        truncation=True,
+        padding=True,
+        max_length=MAX_LENGTH
+    )
+    tokenize_time = time.time() - tokenize_start
+
+    inference_start = time.time()
+    results = _forward(inputs)
+    inference_time = time.time() - inference_start
+    metrics_api.observe('text_tokenize', tokenize_time)
+    metrics_api.observe('text_infer', inference_time)
+    return results, tokenize_time, inference_time
+
+
+def _predict_bucketed(texts, bucket_size):
+    """Score many texts, grouping them by token length so each padded batch holds similar lengths.
+
+    Returns (results, tokenize_time, inference_time) with results in the original order.
+    """
+    tokenizer = _state['tokenizer']
+
+    # Tokenize without padding so the real length of every text is known.
+    tokenize_start = time.time()
+    encodings = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    lengths = [len(ids) for ids in encodings['input_ids']]
+    tokenize_time = time.time() - tokenize_start
+
+    # Sort by length and cut into buckets, so short utterances are never padded to long ones.
+    order = sorted(range(len(texts)), key=lengths.__getitem__)
+    results = [None] * len(texts)
+    inference_start = time.time()
+    for start in range(0, len(order), bucket_size):
+        bucket = order[start:start + bucket_size]
+        features = [{k: encodings[k][i] for k in encodings.keys()} for i in bucket]
+        inputs = tokenizer.pad(features, padding=True, return_tensors='pt')
+        for i, result in zip(bucket, _forward(inputs)):
+            results[i] = result
+    inference_time = time.time() - inference_start
+    metrics_api.observe('text_tokenize', tokenize_time)
+    metrics_api.observe('text_infer', inference_time)
+    return results, tokenize_time, inference_time
+
+
+async def _score_text_batch(texts):
+    # Run the forward pass in a thread so the event loop keeps accepting requests.
+    results, tokenize_time, inference_time = await asyncio.to_thread(_predict_batch, texts)
+    logger.info(
+        f"Text batch scored - size: {len(texts)}, "
+        f"tokenize: {tokenize_time:.4f}s, inference: {inference_time:.4f}s"
+    )
+    return results
+
+
+_batcher = micro_batch.MicroBatcher(_score_text_batch, _batch_config)
+
+
+async def _submit_text(text: str):
+    """Queue one text for micro-batched scoring and wait for its result."""
+    return await _batcher.submit(text)
+
+
+async def score_text(text: str, app=None):
+    """Score one text in-process. Used by the HTTP route and directly by the audio WebSocket."""
     start_time = time.time()
+    text = text if isinstance(text, str) else ""
 
-    # Ensure model initialized (lazy init)
-    if _state['model'] is None or _state['tokenizer'] is None:
-        # Try to initialize using app if available, otherwise initialize without app reference
-        try:
-            await init_text_model(getattr(request.app, 'state', None) or request.app)
-        except Exception:
-            # If init failed, return neutral response rather than raising
-            return {
-                "label": "NEUTRAL",
-                "score": 0.0,
-                "text": (await request.json()).get('text', '')
-            }
-        
-    # Read the JSON and extract the text.
-    data = await request.json()
-    text = data.get("text", "")
     # If text is empty, return NEUTRAL sentiment
     if not text.strip():
         logger.info(
@@ -108,59 +351,36 @@ async def text_sentiment(request: Request):
         )
         return {"label": "NEUTRAL", "score": 0.0, "text": text}
 
+    # Ensure model initialized (lazy init). If init failed, return neutral response rather than raising
+    if _state['model'] is None or _state['tokenizer'] is None:
+        await init_text_model(app)
+        if _state['model'] is None or _state['tokenizer'] is None:
+            return {"label": "NEUTRAL", "score": 0.0, "text": text}
+
     try:
-        import torch
-        tokenizer = _state['tokenizer']
-        model = _state['model']
         device = _state['device']
         temperature = _state.get('temperature', 1.0)
 
-        # Max token length is 256.
-        max_length = 256
-        # Tokenize the input text.
-        tokenize_start = time.time()
-        inputs = tokenizer(
-            text,
-            return_tensors='pt',
-            truncation=True,
-            padding=True,
-            max_length=max_length
-        )
-        # Move tensors to device (CPU or GPU).
-        inputs = {k: v.to(device) for k, v in inputs.items()}
-        tokenize_time = time.time() - tokenize_start
-        # Get predictions.
-        inference_start = time.time()
-        with torch.no_grad():
-            logits = model(**inputs).logits
-            # Apply temperature calibration
-            try:
-                t = float(temperature)
-                if t <= 0.0:
-                    t = 1.0
-            except Exception:
-                t = 1.0
-            calibrated = logits / float(t)
-            probs = torch.softmax(calibrated, dim=1)
-        inference_time = time.time() - inference_start
-        # Get the predicted label and confidence
-        predicted_label = int(torch.argmax(probs, dim=1).item())
-        confidence = float(probs[0][predicted_label])
-        # Map to labels using config when possible
-        label = _map_label(predicted_label)
+        # Repeated utterances skip tokenization and the forward pass entirely.
+        key = _cache_key(text)
+        result = _cache_get(key)
+        if result is None:
+            # Score through the micro-batcher so concurrent requests share one forward pass.
+            result = await _submit_text(text)
+            _cache_put(key, result)
 
         total_time = time.time() - start_time
         logger.info(
             f"Text analysis completed - Text: '{text[:50]}{'...' if len(text) > 50 else ''}', "
-            f"Total: {total_time:.4f}s (tokenize: {tokenize_time:.4f}s, inference: {inference_time:.4f}s) "
-            f"device={device}"
+            f"Total: {total_time:.4f}s device={device}"
         )
 
         return {
-            "label": label,
-            "score": confidence,
+            "label": result["label"],
+            "score": result["score"],
             "text": text,
             "model": "fine-tuned-distilbert-hf",
+            "engine": _state.get('engine'),
             "device": str(device),
             "temperature": float(temperature)
         }
@@ -168,3 +388,79 @@ async def text_sentiment(request: Request):
         error_time = time.time() - start_time
         logger.exception(f"Text sentiment analysis error in {error_time:.4f} seconds: {e}")
         return {"label": "NEUTRAL", "score": 0.0, "text": text, "error": str(e)}
+
+
+@router.post("/api/text-sentiment")
+async def text_sentiment(request: Request):
+    # Read the JSON and extract the text.
+    data = await request.json()
+    return await score_text(data.get("text", ""), request.app)
+
+
+async def score_texts(texts, app=None):
+    """Score many texts in-process with length bucketing. Returns one {label, score, text} per input, in order."""
+    start_time = time.time()
+    texts = [t if isinstance(t, str) else "" for t in texts]
+
+    # Empty texts are NEUTRAL and never reach the model.
+    results = [{"label": "NEUTRAL", "score": 0.0, "text": t} for t in texts]
+    pending = [i for i, t in enumerate(texts) if t.strip()]
+    if not pending:
+        return results
+
+    # Ensure model initialized (lazy init)
+    if _state['model'] is None or _state['tokenizer'] is None:
+        await init_text_model(app)
+        if _state['model'] is None or _state['tokenizer'] is None:
+            return results
+
+    try:
+        # Serve cached results first, and score each distinct uncached text only once.
+        misses = {}
+        for i in pending:
+            key = _cache_key(texts[i])
+            cached = _cache_get(key) if key not in misses else None
+            if cached is not None:
+                results[i].update(cached)
+            else:
+                misses.setdefault(key, []).append(i)
+
+        tokenize_time = inference_time = 0.0
+        if misses:
+            keys = list(misses)
+            scored, tokenize_time, inference_time = await asyncio.to_thread(
+                _predict_bucketed, [texts[misses[k][0]] for k in keys], _batch_config['bulk_batch_size']
+            )
+            for key, result in zip(keys, scored):
+                _cache_put(key, result)
+                for i in misses[key]:
+                    results[i].update(result)
+
+        total_time = time.time() - start_time
+        logger.info(
+            f"Text batch analysis completed - Texts: {len(texts)}, "
+            f"Total: {total_time:.4f}s (tokenize: {tokenize_time:.4f}s, inference: {inference_time:.4f}s)"
+        )
+        return results
+    except Exception as e:
+        error_time = time.time() - start_time
+        logger.exception(f"Text batch sentiment analysis error in {error_time:.4f} seconds: {e}")
+        for i in pending:
+            results[i]["error"] = str(e)
+        return results
+
+
+@router.post("/api/text-sentiment/batch")
+async def text_sentiment_batch(request: Request):
+    """Score a list of texts. Expects {"texts": [...]} and returns one {label, score, text} per input, in order."""
+    data = await request.json()
+    texts = data.get("texts", []) if isinstance(data, dict) else data
+    if not isinstance(texts, list):
+        raise HTTPException(status_code=400, detail="Expected a list of texts")
+    return await score_texts(texts, request.app)
+
+
+@router.get("/api/text-sentiment/cache")
+async def text_sentiment_cache():
+    """Prediction cache counters."""
+    return cache_stats()
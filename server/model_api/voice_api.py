@@ -6,8 +6,17 @@ import time
 import logging
 import json
 import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 
+from model_api import text_api as text_api_module
+from model_api import metrics_api
+from model_api import micro_batch
+from model_api import fusion_api as fusion_api_module
+from model_api import model_store
+
 router = APIRouter()
 
 # Module-level lazy state for heavy resources
@@ -19,13 +28,168 @@ _state = {
     'vosk_model': None,
     'KaldiRecognizer': None,
     'emotion_labels': ['ang', 'hap', 'neu', 'sad'],
+    'emotion_backend': None,
+    'emotion_label_map': {},
+    'emotion_backends': {},  # Load stats per backend name
     'init_lock': asyncio.Lock(),
-    'httpx_client': None
+    'emotion_executor': None
+}
+
+# Emotion inference runs on a bounded thread pool so it never blocks the event loop.
+# `VOICE_EMOTION_WORKERS` caps concurrent forward passes across all sessions, and
+# `VOICE_EMOTION_MAX_INFLIGHT` caps how many windows one session may have in flight.
+# Windows from all sessions arriving within `VOICE_BATCH_WAIT_MS` are analyzed together,
+# up to `VOICE_BATCH_MAX_SIZE` windows per forward pass.
+_emotion_config = {
+    'workers': max(1, int(os.environ.get('VOICE_EMOTION_WORKERS', '2'))),
+    'max_inflight_per_session': max(1, int(os.environ.get('VOICE_EMOTION_MAX_INFLIGHT', '1'))),
+    'max_batch_size': max(1, int(os.environ.get('VOICE_BATCH_MAX_SIZE', '8'))),
+    'max_wait_ms': max(0.0, float(os.environ.get('VOICE_BATCH_WAIT_MS', '50'))),
+    # Seconds of new audio between a session's analyzed windows while it is speaking (per-session override
+    # via a {"type": "config", "emotion_interval": ...} message). Measured on audio arrival rather than
+    # speech frames, so updates keep coming faster than the client's 1.5 s inactivity timeout.
+    'interval_seconds': min(10.0, max(0.25, float(os.environ.get('VOICE_EMOTION_INTERVAL_SECONDS', '1.0'))))
+}
+
+# Voice emotion backends, selected with `VOICE_EMOTION_BACKEND`. `quantize` applies dynamic
+# int8 quantization to the Linear layers after loading (CPU only). `labels` maps the model's
+# output labels onto `emotion_labels`; labels not listed fall back to `_EMOTION_LABEL_ALIASES`.
+VOICE_EMOTION_BACKENDS = {
+    'hubert-large': {'model': 'superb/hubert-large-superb-er', 'quantize': False, 'labels': {}},
+    'hubert-large-int8': {'model': 'superb/hubert-large-superb-er', 'quantize': True, 'labels': {}},
+    'wav2vec2-base': {'model': 'superb/wav2vec2-base-superb-er', 'quantize': False, 'labels': {}},
+    'wav2vec2-base-int8': {'model': 'superb/wav2vec2-base-superb-er', 'quantize': True, 'labels': {}},
+}
+DEFAULT_VOICE_EMOTION_BACKEND = 'hubert-large'
+
+_EMOTION_LABEL_ALIASES = {
+    'angry': 'ang', 'anger': 'ang',
+    'happy': 'hap', 'happiness': 'hap', 'joy': 'hap',
+    'neutral': 'neu',
+    'sadness': 'sad',
 }
 
 logger = logging.getLogger(__name__)
 
-def butter_bandpass(lowcut, highcut, fs, order=4):
+def _mirror_write(buf, pos, capacity, samples):
+    """Write samples into a mirrored ring (length 2 * capacity) and return the new write position.
+
+    Every sample is stored at i and i + capacity, so the latest n samples are always the
+    contiguous slice buf[pos + capacity - n : pos + capacity] and can be viewed without copying.
+    """
+    samples = samples[-capacity:]
+    n = len(samples)
+    first = min(n, capacity - pos)
+    buf[pos:pos + first] = samples[:first]
+    buf[pos + capacity:pos + capacity + first] = samples[:first]
+    rest = n - first
+    if rest:
+        buf[:rest] = samples[first:]
+        buf[capacity:capacity + rest] = samples[first:]
+    return (pos + n) % capacity
+
+
+# Input codecs accepted on /ws/audio and their bytes per sample. Clients declare the codec and sample
+# rate with `?codec=...&sample_rate=...` on connect or a {"type": "config", "codec": ..., "sample_rate": ...}
+# message; everything is decoded to 16 kHz int16 before VAD, Vosk and preprocessing.
+INPUT_CODECS = {'int16': 2, 'float32': 4, 'mulaw': 1}
+
+
+@lru_cache(maxsize=1)
+def _mulaw_table():
+    """G.711 mu-law byte -> int16 sample lookup table, so decoding a chunk is one indexing operation."""
+    u = ~np.arange(256, dtype=np.uint8)
+    exponent = (u >> 4) & 0x07
+    mantissa = (u & 0x0F).astype(np.int32)
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    table = np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=16)
+def _resample_lowpass_sos(in_rate, out_rate, order=8):
+    """Anti-aliasing lowpass below the output Nyquist, computed once per rate pair."""
+    from scipy.signal import butter
+    return butter(order, 0.9 * out_rate / in_rate, btype='low', output='sos')
+
+
+class StreamingResampler:
+    """Chunk-by-chunk sample rate conversion: lowpass (when downsampling) with carried filter state, then
+    linear interpolation with the fractional read position carried across chunks, so output is continuous."""
+
+    def __init__(self, in_rate, out_rate):
+        self.step = in_rate / out_rate  # Input samples per output sample
+        self.sos = _resample_lowpass_sos(in_rate, out_rate) if in_rate > out_rate else None
+        self.zi = None
+        self.prev = 0.0  # Last input sample of the previous chunk, at position -1
+        self.pos = 0.0   # Position of the next output sample, relative to the start of the next chunk
+
+    def process(self, x):
+        n = len(x)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+        if self.sos is not None:
+            from scipy.signal import sosfilt, sosfilt_zi
+            if self.zi is None:
+                self.zi = sosfilt_zi(self.sos) * x[0]
+            x, self.zi = sosfilt(self.sos, x, zi=self.zi)
+
+        # ext[k + 1] is x[k]; ext[0] is the previous chunk's last sample
+        ext = np.concatenate(([self.prev], x))
+        count = int((n - 1 - self.pos) // self.step) + 1 if self.pos <= n - 1 else 0
+        idx = self.pos + 1 + self.step * np.arange(count)
+        i0 = np.floor(idx).astype(np.int64)
+        frac = idx - i0
+        out = ext[i0] * (1.0 - frac) + ext[np.minimum(i0 + 1, n)] * frac
+
+        self.pos += self.step * count - n
+        self.prev = x[-1]
+        return out.astype(np.float32)
+
+
+class AudioInputDecoder:
+    """Decodes a session's incoming audio chunks (any INPUT_CODECS codec and rate) to 16 kHz int16."""
+
+    def __init__(self, codec='int16', sample_rate=16000, target_rate=16000):
+        if codec not in INPUT_CODECS:
+            raise ValueError(f"Unsupported codec '{codec}', expected one of {tuple(INPUT_CODECS)}")
+        sample_rate = int(sample_rate)
+        if not 8000 <= sample_rate <= 192000:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        self.codec = codec
+        self.sample_rate = sample_rate
+        self.width = INPUT_CODECS[codec]
+        self.resampler = StreamingResampler(sample_rate, target_rate) if sample_rate != target_rate else None
+        self._carry = b''
+
+    def decode(self, data):
+        """Decode raw bytes to int16 samples at the target rate. Partial trailing samples wait for the next chunk."""
+        if self._carry:
+            data = self._carry + bytes(data)
+        usable = len(data) - (len(data) % self.width)
+        self._carry = bytes(data[usable:])
+        count = usable // self.width
+
+        if self.codec == 'int16':
+            samples = np.frombuffer(data, dtype='<i2', count=count)
+            if self.resampler is None:
+                return samples
+            audio = samples.astype(np.float32) / 32768.0
+        elif self.codec == 'mulaw':
+            samples = _mulaw_table()[np.frombuffer(data, dtype=np.uint8, count=count)]
+            if self.resampler is None:
+                return samples
+            audio = samples.astype(np.float32) / 32768.0
+        else:
+            audio = np.frombuffer(data, dtype='<f4', count=count)
+
+        if self.resampler is not None:
+            audio = self.resampler.process(audio)
+        return (np.clip(audio, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+
+def _bandpass_band(lowcut, highcut, fs):
     nyq = 0.5 * fs
     low = lowcut / nyq
     high = highcut / nyq
@@ -38,20 +202,47 @@ def butter_bandpass(lowcut, highcut, fs, order=4):
     if low >= high:
         low = 0.001
         high = 0.999
+    return low, high
+
+def butter_bandpass(lowcut, highcut, fs, order=4):
+    low, high = _bandpass_band(lowcut, highcut, fs)
 
     # Import locally to avoid top-level heavy deps
     from scipy.signal import butter
     b, a = butter(order, [low, high], btype='band')
     return b, a
 
+@lru_cache(maxsize=32)
+def butter_bandpass_sos(lowcut, highcut, fs, order=4):
+    """Bandpass design in second-order sections, computed once per (band, sample rate, order)."""
+    low, high = _bandpass_band(lowcut, highcut, fs)
+
+    # Import locally to avoid top-level heavy deps
+    from scipy.signal import butter
+    return butter(order, [low, high], btype='band', output='sos')
+
 def bandpass_filter(data, lowcut, highcut, fs, order=4):
-    b, a = butter_bandpass(lowcut, highcut, fs, order=order)
+    sos = butter_bandpass_sos(lowcut, highcut, fs, order=order)
 
     # Import locally to avoid top-level heavy deps
-    from scipy.signal import lfilter
-    y = lfilter(b, a, data)
+    from scipy.signal import sosfilt
+    y = sosfilt(sos, data)
     return y
 
+def _gate_and_normalize(emphasized, sample_rate):
+    # Noise reduction using spectral gating
+    noise_samples = int(0.1 * sample_rate)
+    if len(emphasized) > noise_samples:
+        noise_floor = np.mean(np.abs(emphasized[:noise_samples]))
+        threshold = noise_floor * 2
+        emphasized = np.where(np.abs(emphasized) < threshold, 0, emphasized)
+
+    # Normalization to [-1, 1] range
+    peak = np.max(np.abs(emphasized))
+    if peak > 0:
+        emphasized = emphasized / peak
+    return emphasized
+
 def audio_preprocessing(audio_data, sample_rate):
     try:
         # Validate inputs
@@ -72,18 +263,7 @@ def audio_preprocessing(audio_data, sample_rate):
         alpha = 0.97
         emphasized = np.append(filtered[0], filtered[1:] - alpha * filtered[:-1])
 
-        # Noise reduction using spectral gating
-        noise_samples = int(0.1 * sample_rate)
-        if len(emphasized) > noise_samples:
-            noise_floor = np.mean(np.abs(emphasized[:noise_samples]))
-            threshold = noise_floor * 2
-            emphasized = np.where(np.abs(emphasized) < threshold, 0, emphasized)
-
-        # Normalization to [-1, 1] range
-        if np.max(np.abs(emphasized)) > 0:
-            emphasized = emphasized / np.max(np.abs(emphasized))
-
-        return emphasized
+        return _gate_and_normalize(emphasized, sample_rate)
 
     except Exception as e:
         logger.error(f"Audio preprocessing error: {e}")
@@ -91,18 +271,57 @@ def audio_preprocessing(audio_data, sample_rate):
         return audio_data
 
 
-def analyze_emotion(audio_tensor_or_array, sr):
-    start_time = time.time()
+class StreamingPreprocessor:
+    """Per-session version of audio_preprocessing that filters each sample exactly once.
+
+    The bandpass and pre-emphasis run on every new chunk with their state carried over, and the
+    results are kept in a ring. window() only applies the noise gate and normalization, which
+    depend on the window itself.
+    """
+
+    def __init__(self, sample_rate, capacity, lowcut=80, highcut=8000, order=4, alpha=0.97):
+        self.sample_rate = sample_rate
+        self.capacity = int(capacity)
+        self.alpha = alpha
+        self._sos = butter_bandpass_sos(lowcut, highcut, sample_rate, order)
+        self._zi = np.zeros((self._sos.shape[0], 2))  # Filter state carried across chunks
+        self._last = None  # Last filtered sample, for pre-emphasis across chunk boundaries
+        self._buf = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._pos = 0
+        self.available = 0
+
+    def feed(self, samples):
+        """Filter and pre-emphasize newly arrived float32 samples."""
+        if len(samples) == 0:
+            return
+        # Import locally to avoid top-level heavy deps
+        from scipy.signal import sosfilt
+        filtered, self._zi = sosfilt(self._sos, samples, zi=self._zi)
 
-    # Accept torch tensor or numpy array and use state objects
-    torch = _state.get('torch')
-    emotion_pipe = _state.get('emotion_pipe')
-    emotion_labels = _state.get('emotion_labels')
-    if torch is None or emotion_pipe is None:
-        # Models not initialized, return neutral
-        return {label: 0.0 if label != 'neu' else 1.0 for label in emotion_labels}, 0.0
+        # Apply pre-emphasis filter to enhance high frequencies
+        emphasized = np.empty_like(filtered)
+        emphasized[0] = filtered[0] if self._last is None else filtered[0] - self.alpha * self._last
+        emphasized[1:] = filtered[1:] - self.alpha * filtered[:-1]
+        self._last = filtered[-1]
+
+        self._pos = _mirror_write(self._buf, self._pos, self.capacity, emphasized.astype(np.float32))
+        self.available = min(self.capacity, self.available + len(samples))
+
+    def window(self, num_samples):
+        """Return the gated, normalized most recent num_samples samples as a new array."""
+        num_samples = min(int(num_samples), self.available)
+        end = self._pos + self.capacity
+        return _gate_and_normalize(self._buf[end - num_samples:end], self.sample_rate)
 
-    if isinstance(audio_tensor_or_array, torch.Tensor):
+
+def _neutral_emotion():
+    return {label: 0.0 if label != 'neu' else 1.0 for label in _state.get('emotion_labels')}
+
+
+def _to_normalized_numpy(audio_tensor_or_array):
+    # Accept torch tensor or numpy array
+    torch = _state.get('torch')
+    if torch is not None and isinstance(audio_tensor_or_array, torch.Tensor):
         audio_numpy = audio_tensor_or_array.squeeze().cpu().numpy()
     else:
         audio_numpy = np.asarray(audio_tensor_or_array).squeeze()
@@ -110,69 +329,253 @@ def analyze_emotion(audio_tensor_or_array, sr):
     # Normalize to [-1, 1]
     if np.max(np.abs(audio_numpy)) > 0:
         audio_numpy = audio_numpy / np.max(np.abs(audio_numpy))
+    return audio_numpy
+
+
+def _scores_from_preds(preds):
+    # preds is a list of {'label': 'ang', 'score': 0.9}
+    scores = {label: 0.0 for label in _state.get('emotion_labels')}
+    label_map = _state.get('emotion_label_map') or {}
+    for p in preds:
+        lbl = str(p.get("label", "")).lower()
+        lbl = label_map.get(lbl, _EMOTION_LABEL_ALIASES.get(lbl, lbl))
+        sc = float(p.get("score", 0.0))
+        if lbl in scores:
+            scores[lbl] = round(sc, 4)
+    return scores
+
+
+def analyze_emotion(audio_tensor_or_array, sr):
+    start_time = time.time()
+
+    emotion_pipe = _state.get('emotion_pipe')
+    emotion_labels = _state.get('emotion_labels')
+    if _state.get('torch') is None or emotion_pipe is None:
+        # Models not initialized, return neutral
+        return _neutral_emotion(), 0.0
+
+    audio_numpy = _to_normalized_numpy(audio_tensor_or_array)
 
     try:
         preds = emotion_pipe({"array": audio_numpy, "sampling_rate": sr}, top_k=len(emotion_labels))
         emotion_time = time.time() - start_time
-
-        # preds is a list of {'label': 'ang', 'score': 0.9}
-        scores = {label: 0.0 for label in emotion_labels}
-        for p in preds:
-            lbl = p.get("label")
-            sc = float(p.get("score", 0.0))
-            if lbl in scores:
-                scores[lbl] = round(sc, 4)
-        return scores, emotion_time
+        metrics_api.observe('emotion', emotion_time)
+        return _scores_from_preds(preds), emotion_time
     except Exception as e:
         logger.error(f"Emotion detection error: {e}")
-        return {label: 0.0 if label != 'neu' else 1.0 for label in emotion_labels}, 0.0
+        return _neutral_emotion(), 0.0
 
 
-def vad(audio_tensor, sr, frame_duration_ms=30, aggressiveness=3):
-    # Creates a VAD object
-    # import webrtcvad locally to avoid heavy top-level import
-    import webrtcvad
-    vad_inst = webrtcvad.Vad(aggressiveness)
+def analyze_emotion_batch(audio_arrays, sr, raise_errors=False):
+    """Analyze several windows in one padded forward pass. Returns (list of scores, emotion_time).
+
+    Failures give neutral scores unless `raise_errors` is set (the deep health probe sets it).
+    """
+    start_time = time.time()
+
+    emotion_pipe = _state.get('emotion_pipe')
+    emotion_labels = _state.get('emotion_labels')
+    if _state.get('torch') is None or emotion_pipe is None:
+        if raise_errors:
+            raise RuntimeError("Voice emotion model is not loaded")
+        # Models not initialized, return neutral
+        return [_neutral_emotion() for _ in audio_arrays], 0.0
 
+    inputs = [{"array": _to_normalized_numpy(a), "sampling_rate": sr} for a in audio_arrays]
+    try:
+        # The pipeline pads the inputs into one batch; live windows all share the same length.
+        preds = emotion_pipe(inputs, top_k=len(emotion_labels), batch_size=len(inputs))
+        emotion_time = time.time() - start_time
+        metrics_api.observe('emotion', emotion_time)
+        return [_scores_from_preds(p) for p in preds], emotion_time
+    except Exception as e:
+        if raise_errors:
+            raise
+        logger.error(f"Batched emotion detection error: {e}")
+        return [_neutral_emotion() for _ in audio_arrays], 0.0
+
+
+def _get_emotion_executor():
+    if _state['emotion_executor'] is None:
+        _state['emotion_executor'] = ThreadPoolExecutor(
+            max_workers=_emotion_config['workers'], thread_name_prefix='voice-emotion'
+        )
+    return _state['emotion_executor']
+
+
+async def _run_emotion_batch(batch):
+    """Analyze (window, sample rate) pairs on the emotion executor. Returns (scores, emotion_time) per pair."""
+    # Windows from different sessions may carry different sample rates; batch each rate separately.
+    by_rate = {}
+    for i, (_, sr) in enumerate(batch):
+        by_rate.setdefault(sr, []).append(i)
+    results = [None] * len(batch)
+    loop = asyncio.get_running_loop()
+    for sr, indices in by_rate.items():
+        try:
+            scores, emotion_time = await loop.run_in_executor(
+                _get_emotion_executor(), analyze_emotion_batch, [batch[i][0] for i in indices], sr
+            )
+        except Exception as e:
+            for i in indices:
+                results[i] = e
+            continue
+        logger.debug(f"Emotion batch analyzed - size: {len(indices)}, time: {emotion_time:.4f}s")
+        for i, sc in zip(indices, scores):
+            results[i] = (sc, emotion_time)
+    return results
+
+
+# Gathers pending windows from all live sessions into padded batches, one batch in flight per executor worker
+_emotion_batcher = micro_batch.MicroBatcher(_run_emotion_batch, _emotion_config, _emotion_config['workers'])
+
+
+async def analyze_emotion_async(audio_np, sr):
+    """Queue a preprocessed window for the shared cross-session emotion batcher and await its scores."""
+    return await _emotion_batcher.submit((audio_np, sr))
+
+
+class StreamingVAD:
+    """Per-session webrtcvad wrapper that classifies each new frame once.
+
+    Keeps the speech-segment state machine across calls and a running count of speech
+    frames over the last `window_seconds`, so the speech ratio is available in O(1).
+    Completed segments are kept in a deque of `max_segments` (None keeps every segment).
+    """
+
+    def __init__(self, sr, window_seconds, frame_duration_ms=30, aggressiveness=3, max_segments=None):
+        # import webrtcvad locally to avoid heavy top-level import
+        import webrtcvad
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self.sr = sr
+        self.frame_size = int(sr * frame_duration_ms / 1000)
+        self.frame_seconds = self.frame_size / sr
+        self.window_frames = max(1, int(round(window_seconds * 1000 / frame_duration_ms)))
+        self._flags = deque()  # Speech flag of each frame in the current window
+        self._window_speech = 0  # Number of speech frames in the current window
+        self._pending = np.zeros(0, dtype=np.int16)  # Samples not yet forming a full frame
+        self.samples_seen = 0  # Samples classified so far (whole frames only)
+        self.speech_frames_total = 0
+        self.triggered = False  # Whether we are currently in a speech segment
+        self._segment_start = 0
+        self.segments = deque(maxlen=max_segments)  # Completed (start, end) segments in samples
+
+    def feed(self, samples):
+        """Classify the newly arrived int16 samples. Returns the number of new speech frames."""
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        frame_size = self.frame_size
+        num_frames = len(samples) // frame_size
+        new_speech = 0
+
+        for i in range(num_frames):
+            frame = samples[i * frame_size:(i + 1) * frame_size]
+            start = self.samples_seen
+            end = start + frame_size
+            self.samples_seen = end
+
+            # Check if current frame contains speech
+            is_speech = self._vad.is_speech(frame.tobytes(), self.sr)
+
+            # Slide the window: add the new flag and drop the oldest one
+            self._flags.append(is_speech)
+            if is_speech:
+                self._window_speech += 1
+                new_speech += 1
+            if len(self._flags) > self.window_frames and self._flags.popleft():
+                self._window_speech -= 1
+
+            # If speech detected and currently not in speech segment, mark start of speech.
+            if is_speech and not self.triggered:
+                self.triggered = True
+                self._segment_start = start
+
+            # If no speech detected and currently in speech segment, mark end of speech.
+            elif not is_speech and self.triggered:
+                self.triggered = False
+                self.segments.append((self._segment_start, end))
+
+        self._pending = samples[num_frames * frame_size:].copy()
+        self.speech_frames_total += new_speech
+        return new_speech
+
+    @property
+    def speech_ratio(self):
+        """Fraction of the last window_seconds classified as speech."""
+        return self._window_speech / self.window_frames
+
+    @property
+    def has_speech(self):
+        return self._window_speech > 0
+
+    def finish(self):
+        """Close an open segment at the end of the stream and return all segments in seconds."""
+        if self.triggered:
+            self.triggered = False
+            self.segments.append((self._segment_start, self.samples_seen + len(self._pending)))
+        return [(s / self.sr, e / self.sr) for s, e in self.segments]
+
+
+def vad(audio_tensor, sr, frame_duration_ms=30, aggressiveness=3):
+    """One-shot VAD over a whole clip. Returns rounded (start, end) speech segments in seconds."""
     # squeeze() to remove extra dimensions. Converts from float32 to int16.
-    audio = audio_tensor.squeeze().numpy()
+    audio = audio_tensor.squeeze().numpy() if hasattr(audio_tensor, 'numpy') else np.asarray(audio_tensor).squeeze()
     audio_pcm = (audio * 32767.0).astype('int16')
 
-    # Calculates frame size and number of frames.
-    frame_size = int(sr * frame_duration_ms / 1000)
-    num_frames = len(audio_pcm) // frame_size
+    streaming_vad = StreamingVAD(sr, len(audio_pcm) / sr, frame_duration_ms, aggressiveness, max_segments=None)
+    streaming_vad.feed(audio_pcm)
+    # If end of audio is reached and no silence detected after speech started, assume speech lasted entire duration.
+    segments = streaming_vad.finish()
+    return [(round(s, 2), round(e, 2)) for s, e in segments]
+
+
+def _model_memory_mb(model):
+    """Approximate weight memory of a model, including packed weights of quantized layers."""
+    def tensor_bytes(value):
+        if hasattr(value, 'element_size') and hasattr(value, 'numel'):
+            return value.element_size() * value.numel()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(v) for v in value)
+        return 0
 
-    segments = []  # Store start_time and end_time of speech
-    triggered = False  # Boolean flag to track if we are currently in a speech segment
-    start_idx = 0
+    return round(sum(tensor_bytes(v) for v in model.state_dict().values()) / (1024 * 1024), 1)
 
-    # Loop through each frame,
-    for i in range(num_frames):
-        start = i * frame_size
-        end = start + frame_size
-        frame = audio_pcm[start:end]
 
-        # Handle incomplete frames
-        if len(frame) < frame_size:
-            break
+def _load_emotion_backend(name, use_device):
+    """Build the audio-classification pipeline for a registered backend and record its load stats."""
+    from transformers import pipeline
+    torch = _state['torch']
 
-        # Check if current frame contains speech
-        is_speech = vad_inst.is_speech(frame.tobytes(), sr)
+    backend = VOICE_EMOTION_BACKENDS[name]
+    start_time = time.time()
+    # Exported safetensors artifacts load memory-mapped and without hub lookups
+    source, options = model_store.resolve(backend['model'])
+    emotion_pipe = pipeline("audio-classification", model=source, device=use_device, model_kwargs=options)
+    if backend['quantize']:
+        if use_device != -1:
+            raise RuntimeError(f"Voice emotion backend '{name}' is quantized and requires CPU")
+        emotion_pipe.model = torch.quantization.quantize_dynamic(emotion_pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+    load_time = time.time() - start_time
+
+    _state['emotion_backends'][name] = {
+        "model": backend['model'],
+        "quantized": backend['quantize'],
+        "load_time_s": round(load_time, 3),
+        "memory_mb": _model_memory_mb(emotion_pipe.model)
+    }
+    _state['emotion_label_map'] = {k.lower(): v for k, v in backend['labels'].items()}
+    logger.info(f"Voice emotion backend '{name}' ({backend['model']}) loaded in {load_time:.2f}s")
+    return emotion_pipe
 
-        # If speech detected and currently not in speech segment, mark start of speech.
-        if is_speech and not triggered:
-            triggered = True
-            start_idx = start
 
-        # If no speech detected and currently in speech segment, mark end of speech.
-        elif not is_speech and triggered:
-            triggered = False
-            segments.append((start_idx / sr, end / sr))
+VOSK_MODEL_PATH = "models/vosk-model-small-en-us-0.15"
 
-    # If end of audio is reached and no silence detected after speech started, assume speech lasted entire duration.
-    if triggered:
-        segments.append((start_idx / sr, len(audio_pcm) / sr))
-    return [(round(s, 2), round(e, 2)) for s, e in segments]
+
+def _load_vosk_model(VoskModel):
+    start_time = time.time()
+    vosk_model = VoskModel(VOSK_MODEL_PATH)
+    logger.info(f"Vosk model loaded in {time.time() - start_time:.2f}s")
+    return vosk_model
 
 
 async def init_voice_models(app=None):
@@ -187,7 +590,6 @@ async def init_voice_models(app=None):
             # Lazy imports
             import torch
             import torchaudio
-            from transformers import pipeline
             from vosk import Model as VoskModel, KaldiRecognizer
 
             # Set torch in state for utility functions
@@ -196,21 +598,21 @@ async def init_voice_models(app=None):
 
             device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
             use_device = 0 if (device.type == 'cuda') else -1
-            emotion_pipe = pipeline("audio-classification", model="superb/hubert-large-superb-er", device=use_device)
-
-            vosk_model = VoskModel("models/vosk-model-small-en-us-0.15")
+            backend = os.environ.get('VOICE_EMOTION_BACKEND', DEFAULT_VOICE_EMOTION_BACKEND).strip().lower()
+            if backend not in VOICE_EMOTION_BACKENDS:
+                logger.warning(f"Unknown voice emotion backend '{backend}', using '{DEFAULT_VOICE_EMOTION_BACKEND}'")
+                backend = DEFAULT_VOICE_EMOTION_BACKEND
+            # The emotion model and Vosk load concurrently in worker threads
+            emotion_pipe, vosk_model = await asyncio.gather(
+                asyncio.to_thread(_load_emotion_backend, backend, use_device),
+                asyncio.to_thread(_load_vosk_model, VoskModel),
+            )
 
             _state['emotion_pipe'] = emotion_pipe
+            _state['emotion_backend'] = backend
             _state['vosk_model'] = vosk_model
             _state['KaldiRecognizer'] = KaldiRecognizer
 
-            # Create a reusable AsyncClient for internal HTTP calls
-            try:
-                import httpx
-                _state['httpx_client'] = httpx.AsyncClient()
-            except Exception:
-                _state['httpx_client'] = None
-
             if app is not None:
                 try:
                     app.state.voice_models_loaded = True
@@ -223,29 +625,17 @@ async def init_voice_models(app=None):
 
 @router.get("/health")
 async def health_check():
-    """Health check endpoint for Render monitoring"""
-    try:
-        # Quick test to ensure models are loaded
-        try:
-            await init_voice_models()
-            torch = _state.get('torch')
-            emotion_labels = _state.get('emotion_labels')
-            vosk_model = _state.get('vosk_model')
-            test_tensor = torch.zeros(1, 1000)  # 1000 samples = ~0.06s at 16kHz
-            emotion_test, _ = analyze_emotion(test_tensor, 16000)
-            return {
-                "status": "healthy",
-                "models_loaded": True,
-                "emotion_labels": emotion_labels,
-                "vosk_model": ("loaded" if vosk_model is not None else "missing")
-            }
-        except Exception as e:
-            return {"status": "unhealthy", "error": str(e)}
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    """Health check endpoint for Render monitoring. Reports cached load state; never loads or runs models."""
+    vosk_model = _state.get('vosk_model')
+    loaded = _state.get('emotion_pipe') is not None and vosk_model is not None
+    return {
+        "status": "healthy" if loaded else ("starting" if _state['init_lock'].locked() else "not_loaded"),
+        "models_loaded": loaded,
+        "emotion_labels": _state.get('emotion_labels'),
+        "emotion_backend": _state.get('emotion_backend'),
+        "emotion_backends": _state.get('emotion_backends'),
+        "vosk_model": ("loaded" if vosk_model is not None else "missing")
+    }
 
 
 @router.get("/")
@@ -256,6 +646,9 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
+            "live": "/health/live",
+            "ready": "/health/ready",
+            "deep": "/health/deep",
             "websocket": "/ws/audio"
         }
     }
@@ -264,6 +657,30 @@ async def root():
 last_transcript = ""
 
 
+# Outbound message framings for /ws/audio
+WS_FORMATS = ('json', 'msgpack')
+
+
+def _negotiate_ws_format(requested):
+    """Framing for a client's requested format; JSON unless msgpack is both requested and installed."""
+    requested = str(requested or 'json').lower()
+    if requested not in WS_FORMATS:
+        return 'json'
+    if requested == 'msgpack':
+        try:
+            import msgpack  # noqa: F401
+        except Exception:
+            logger.warning("msgpack framing requested but msgpack is not installed; using JSON")
+            return 'json'
+    return requested
+
+
+def _pack_msgpack(message):
+    import msgpack
+    # Scores don't need double precision; single floats are 5 bytes instead of 9
+    return msgpack.packb(message, use_single_float=True)
+
+
 @router.websocket("/ws/audio")
 async def websocket_audio(websocket: WebSocket):
     global last_transcript
@@ -283,117 +700,260 @@ async def websocket_audio(websocket: WebSocket):
         return
 
     recognizer = KaldiRecognizer(vosk_model, sample_rate)  # Creates a Vosk recognizer instance
-    audio_buffer = bytearray()  # Buffer for sliding window (voice sentiment)
     window_seconds = 1.5  # 1.5 seconds window size for better emotion detection
-    window_size = int(window_seconds * sample_rate * 2)  # 2 bytes per int16 sample, ensure integer
+    window_size = int(window_seconds * sample_rate)  # Window length in samples
+    try:
+        decoder = AudioInputDecoder(
+            websocket.query_params.get('codec', 'int16'), websocket.query_params.get('sample_rate', sample_rate)
+        )
+    except ValueError as e:
+        logger.warning(f"Invalid audio format requested, using int16 at {sample_rate} Hz: {e}")
+        decoder = AudioInputDecoder('int16', sample_rate)
+    input_format = {'decoder': decoder}
+    # Classifies each new frame once; a live session only needs its recent segments
+    session_vad = StreamingVAD(sample_rate, window_seconds, aggressiveness=2, max_segments=256)
+    # Owns the session's recent audio: filters each new sample once and keeps the last window
+    preprocessor = StreamingPreprocessor(sample_rate, window_size)
     stop_task = False
 
+    # Limits windows this session may have queued or running on the emotion executor
+    inflight = asyncio.Semaphore(_emotion_config['max_inflight_per_session'])
+    inflight_tasks = set()
+
+    # Emotion analysis is driven by audio arrival: the receive loop sets audio_event, and a new
+    # window is analyzed once `emotion_interval` seconds of new audio have arrived while the window has speech.
+    audio_event = asyncio.Event()
+    cadence = {
+        'emotion_interval': _emotion_config['interval_seconds'],
+        'analyzed_samples': 0,  # session_vad.samples_seen at the last dispatched window
+        'dispatched_seq': 0,
+        'sent_seq': 0,
+        'silence_sent': False,
+        'last_partial': None  # Last partial text sent; unchanged partials are not resent
+    }
+
+    # Outbound framing: JSON text frames (default) or msgpack binary frames, chosen with `?format=msgpack`
+    # on connect or a {"type": "config", "format": ...} message. msgpack sessions get emotion scores as
+    # arrays in `emotion_labels` order, announced once in a `format` message.
+    framing = {'format': _negotiate_ws_format(websocket.query_params.get('format'))}
+
+    async def send_message(message):
+        if framing['format'] == 'msgpack':
+            await websocket.send_bytes(_pack_msgpack(message))
+        else:
+            await websocket.send_text(json.dumps(message))
+
+    def encode_emotion(emotion):
+        if framing['format'] == 'msgpack':
+            return [emotion.get(label, 0.0) for label in emotion_labels]
+        return emotion
+
+    async def announce_format():
+        await send_message({"type": "format", "format": framing['format'], "emotion_labels": emotion_labels})
+
+    # Server-side fusion of this session's face, voice and text scores. Enabled by a
+    # {"type": "config", "fusion": true} message or the first {"type": "face", ...} message;
+    # a `fusion` message is pushed whenever the fused result changes.
+    fusion = fusion_api_module.StreamingFusion(fusion_api_module._stream_config['ewma_alpha'])
+    fusion_state = {'enabled': False}
+
+    async def push_fusion(modality=None, vector=None):
+        # Latest vectors are always kept, so enabling fusion mid-session starts from the current scores;
+        # fusing (and its timing) only runs while fusion is enabled
+        if not fusion_state['enabled']:
+            if modality is not None:
+                fusion.store(modality, vector)
+            return
+        message = fusion.message(fusion.update(modality, vector))
+        if message is not None:
+            await send_message(message)
+
+    async def send_voice_emotion(audio_np, speech_ratio, seq):
+        async with inflight:
+            try:
+                emotion, emotion_time = await analyze_emotion_async(audio_np, sample_rate)
+                # A newer window already reported: this result is superseded
+                if seq < cadence['sent_seq']:
+                    return
+                cadence['sent_seq'] = seq
+                await send_message({
+                    "type": "voice_sentiment",
+                    "emotion": encode_emotion(emotion),
+                    "speech_ratio": round(speech_ratio, 2)
+                })
+                await push_fusion('voice', fusion_api_module.voice_vector(emotion))
+            except Exception as e:
+                # Send neutral emotion on error so client knows something happened
+                neutral = {label: 0.0 if label != 'neu' else 1.0 for label in emotion_labels}
+                await send_message({
+                    "type": "voice_sentiment",
+                    "emotion": encode_emotion(neutral),
+                    "error": str(e)
+                })
+                await push_fusion('voice', fusion_api_module.voice_vector(neutral))
+        # Re-check: speech that arrived while this window was busy may already be due
+        audio_event.set()
+
     async def perform_voice_sentiment():
         while not stop_task:
-            if len(audio_buffer) >= window_size:
-                # Get the most recent window_size bytes
-                window_bytes = audio_buffer[-window_size:]
-                audio_np = np.frombuffer(window_bytes, dtype=np.int16).astype(np.float32) / 32767.0
-
-                try:
-                    # VAD check on raw audio first
-                    speech_segments = vad(torch.tensor(audio_np).unsqueeze(0), sample_rate, aggressiveness=2)
-
-                    if speech_segments:
-                        # Calculate speech ratio to avoid processing very short speech
-                        total_speech = sum(end - start for start, end in speech_segments)
-                        speech_ratio = total_speech / window_seconds
-
-                        # Only process if speech ratio is high enough (>30%)
-                        if speech_ratio > 0.3:
-                            # Run audio preprocessing only when needed
-                            filtered_audio = audio_preprocessing(audio_np, sample_rate)
-                            segment_tensor = torch.tensor(filtered_audio).unsqueeze(0)
-
-                            # Analyze emotion on preprocessed audio
-                            emotion, emotion_time = analyze_emotion(segment_tensor, sample_rate)
-                            await websocket.send_text(json.dumps({
-                                "type": "voice_sentiment",
-                                "emotion": emotion,
-                                "speech_ratio": round(speech_ratio, 2)
-                            }))
-                        else:
-                            # Low speech activity. Don't send anything
-                            pass
-                    else:
-                        # No speech detected: send zeros
-                        await websocket.send_text(json.dumps({
-                            "type": "voice_sentiment",
-                            "emotion": {label: 0.0 for label in emotion_labels},
-                            "speech_ratio": 0.0
-                        }))
-                except Exception as e:
-                    # Send neutral emotion on error so client knows something happened
-                    await websocket.send_text(json.dumps({
+            # Sleep until new audio arrives; idle sessions cost nothing
+            await audio_event.wait()
+            audio_event.clear()
+            if stop_task or preprocessor.available < window_size:
+                continue
+            try:
+                # VAD state is kept up to date as audio arrives; just read it
+                if session_vad.has_speech:
+                    cadence['silence_sent'] = False
+                    # Speech ratio to avoid processing very short speech
+                    speech_ratio = session_vad.speech_ratio
+                    new_audio = (session_vad.samples_seen - cadence['analyzed_samples']) / sample_rate
+
+                    # Only process if speech ratio is high enough (>30%) and enough new audio arrived.
+                    # While this session is at its in-flight limit, later audio just waits; the next
+                    # dispatch takes the latest window, so superseded windows are never analyzed.
+                    if speech_ratio > 0.3 and new_audio >= cadence['emotion_interval'] and not inflight.locked():
+                        # Already filtered as it arrived; only gating and normalization run here.
+                        # The result is a new array, so the ring can keep filling while inference runs.
+                        with metrics_api.timer('preprocess_window'):
+                            audio_np = preprocessor.window(window_size)
+                        cadence['analyzed_samples'] = session_vad.samples_seen
+                        cadence['dispatched_seq'] += 1
+                        task = asyncio.create_task(send_voice_emotion(audio_np, speech_ratio, cadence['dispatched_seq']))
+                        inflight_tasks.add(task)
+                        task.add_done_callback(inflight_tasks.discard)
+                elif not cadence['silence_sent']:
+                    # No speech detected: send zeros once when the window falls silent
+                    cadence['silence_sent'] = True
+                    await send_message({
                         "type": "voice_sentiment",
-                        "emotion": {label: 0.0 if label != 'neu' else 1.0 for label in emotion_labels},
-                        "error": str(e)
-                    }))
-            await asyncio.sleep(1)
-
+                        "emotion": encode_emotion({label: 0.0 for label in emotion_labels}),
+                        "speech_ratio": 0.0
+                    })
+                    # An all-zero voice vector counts as absent in fusion
+                    await push_fusion('voice', None)
+            except Exception as e:
+                # Send neutral emotion on error so client knows something happened
+                await send_message({
+                    "type": "voice_sentiment",
+                    "emotion": encode_emotion({label: 0.0 if label != 'neu' else 1.0 for label in emotion_labels}),
+                    "error": str(e)
+                })
+
+    async def handle_control_message(text):
+        """Apply a JSON message from the client: {"type": "config", "emotion_interval": 2.0, "codec": "float32",
+        "sample_rate": 48000, "format": "msgpack", "fusion": true, "fusion_alpha": 0.3} (any subset of keys)
+        or {"type": "face", "scores": [truth, lie]}."""
+        try:
+            message = json.loads(text)
+        except Exception:
+            return
+        if not isinstance(message, dict):
+            return
+        if message.get("type") == "face":
+            scores = message.get("scores")
+            fusion_state['enabled'] = True
+            await push_fusion('face', scores if isinstance(scores, list) else None)
+            return
+        if message.get("type") != "config":
+            return
+        if "emotion_interval" in message:
+            try:
+                cadence['emotion_interval'] = min(10.0, max(0.25, float(message["emotion_interval"])))
+            except Exception:
+                pass
+        if "codec" in message or "sample_rate" in message:
+            current = input_format['decoder']
+            try:
+                input_format['decoder'] = AudioInputDecoder(
+                    str(message.get("codec", current.codec)), message.get("sample_rate", current.sample_rate)
+                )
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Ignoring invalid audio format from client: {e}")
+        if "format" in message:
+            new_format = _negotiate_ws_format(message["format"])
+            if new_format != framing['format']:
+                framing['format'] = new_format
+                await announce_format()
+        if "fusion_alpha" in message:
+            try:
+                fusion.set_alpha(message["fusion_alpha"])
+            except Exception:
+                pass
+        if "fusion" in message:
+            fusion_state['enabled'] = bool(message["fusion"])
+            if fusion_state['enabled']:
+                # Send the current state right away rather than waiting for the next score
+                await push_fusion()
+
+    if framing['format'] != 'json':
+        await announce_format()
     voice_sentiment_task = asyncio.create_task(perform_voice_sentiment())
+    metrics_api.gauge_add('ws_sessions', 1)
 
     try:
         while True:
-            data = await websocket.receive_bytes()
-            audio_buffer.extend(data)
-
-            # Keep buffer at most window_size * 2 (for safety)
-            if len(audio_buffer) > window_size * 2:
-                audio_buffer = audio_buffer[-window_size * 2:]
+            message = await websocket.receive()
+            if message.get("type") == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                await handle_control_message(message["text"])
+                continue
+            data = message.get("bytes")
+            if not data:
+                continue
+            with metrics_api.timer('decode'):
+                samples = input_format['decoder'].decode(data)
+            if len(samples) == 0:
+                continue
+            with metrics_api.timer('vad'):
+                session_vad.feed(samples)
+            with metrics_api.timer('preprocess'):
+                preprocessor.feed(samples.astype(np.float32) / 32767.0)
+            audio_event.set()
 
             # Feed data directly to Vosk recognizer
-            if recognizer.AcceptWaveform(data):
+            with metrics_api.timer('vosk_accept'):
+                is_final = recognizer.AcceptWaveform(samples.tobytes())
+            if is_final:
+                # The recognizer starts a new utterance; its first partial is always sent
+                cadence['last_partial'] = None
                 result = json.loads(recognizer.Result())
                 final_text = result.get("text", "")
 
                 if final_text.strip():
-                    transcript_start_time = time.time()
                     last_transcript = final_text
 
-                    # Text sentiment analysis: call the /api/text-sentiment endpoint
-                    sentiment_start_time = time.time()
-                    # Prefer internal client if available to avoid creating per-call clients
-                    client = _state.get('httpx_client')
-                    if client is None:
-                        try:
-                            import httpx
-                            async with httpx.AsyncClient() as temp_client:
-                                resp = await temp_client.post("http://localhost:8000/api/text-sentiment", json={"text": final_text})
-                                sentiment = resp.json()
-                        except Exception:
-                            sentiment = {"label": "NEUTRAL", "score": 0.0}
-                    else:
-                        try:
-                            resp = await client.post("http://localhost:8000/api/text-sentiment", json={"text": final_text})
-                            sentiment = resp.json()
-                        except Exception:
-                            sentiment = {"label": "NEUTRAL", "score": 0.0}
-                    sentiment_time = time.time() - sentiment_start_time
-
-                    total_transcript_time = time.time() - transcript_start_time
-                    await websocket.send_text(json.dumps({
+                    # Text sentiment analysis: score in-process, no HTTP round trip
+                    try:
+                        sentiment = await text_api_module.score_text(final_text, websocket.app)
+                    except Exception:
+                        sentiment = {"label": "NEUTRAL", "score": 0.0}
+                    await send_message({
                         "type": "text_sentiment",
                         "text": final_text,
                         "label": sentiment.get("label"),
                         "score": sentiment.get("score")
-                    }))
+                    })
+                    await push_fusion('text', fusion_api_module.text_vector(sentiment.get("label"), sentiment.get("score")))
             else:
-                partial = json.loads(recognizer.PartialResult())
-                await websocket.send_text(json.dumps({
-                    "type": "partial",
-                    "text": partial.get("partial", "")
-                }))
+                partial_text = json.loads(recognizer.PartialResult()).get("partial", "")
+                if partial_text != cadence['last_partial']:
+                    cadence['last_partial'] = partial_text
+                    await send_message({
+                        "type": "partial",
+                        "text": partial_text
+                    })
     except Exception:
         pass
     finally:
+        metrics_api.gauge_add('ws_sessions', -1)
         stop_task = True
+        audio_event.set()
         try:
             await voice_sentiment_task
         except Exception:
             pass
+        # Wait for windows still on the executor so nothing sends after the socket closes
+        if inflight_tasks:
+            await asyncio.gather(*inflight_tasks, return_exceptions=True)
@@ -0,0 +1,72 @@
+"""Time summary template rendering for sessions of different sizes.
+
+Compares the prebuilt environment used by the export endpoint against building a fresh environment
+per render, which is what every export used to do.
+
+Run from the server directory:
+    python -m tests.export_render_bench
+"""
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from model_api import export_api
+
+# (timeline points, transcript segments)
+SIZES = [(10, 5), (100, 50), (1000, 200), (5000, 1000), (50000, 1000)]
+
+REPEATS = 20
+
+
+def make_session(points, segments):
+    start_ms = 1757419200000
+    return {
+        "session_id": f"bench-{points}",
+        "timestamp": "2025-09-09T12:00:00Z",
+        "fusion_score": 0.72,
+        "modalities": {"face": 0.6, "voice": 0.8, "text": 0.7},
+        "timeline": [{"time": start_ms + i * 500, "score": (i % 100) / 100} for i in range(points)],
+        "transcript": [
+            {"start": start_ms + i * 2000, "end": start_ms + i * 2000 + 1500, "text": f"Sentence number {i} of the session."}
+            for i in range(segments)
+        ],
+    }
+
+
+def render_fresh_env(data):
+    env = Environment(
+        loader=FileSystemLoader(export_api._template_config['dir']),
+        autoescape=select_autoescape(['html', 'xml']),
+    )
+    env.filters['fmt_time'] = export_api._fmt_time
+    env.filters['fmt_datetime'] = export_api._fmt_datetime
+    env.filters['fmt_offset'] = export_api._fmt_offset
+    # Same timeline preparation as the endpoint, so only the environment setup differs
+    session = export_api._prepare_session(data)
+    return env.get_template(export_api._template_config['name']).render(
+        session=session,
+        timeline_points=export_api.timeline_svg_points(session.get('timeline')),
+        timeline_size=export_api._timeline_config,
+    )
+
+
+def time_ms(fn, data):
+    fn(data)
+    start_time = time.perf_counter()
+    for _ in range(REPEATS):
+        fn(data)
+    return (time.perf_counter() - start_time) / REPEATS * 1000
+
+
+def main():
+    print("Summary Template Render Benchmark")
+    print(f"{'Timeline':>9} {'Segments':>9} {'Prebuilt (ms)':>14} {'Fresh env (ms)':>15} {'Speedup':>8}")
+    for points, segments in SIZES:
+        data = make_session(points, segments)
+        prebuilt = time_ms(export_api.render_summary_html, data)
+        fresh = time_ms(render_fresh_env, data)
+        print(f"{points:>9} {segments:>9} {prebuilt:>14.2f} {fresh:>15.2f} {fresh / prebuilt:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
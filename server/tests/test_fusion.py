@@ -1,4 +1,8 @@
 import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from model_api import fusion_api
 
 # API endpoint
 API_URL = "http://localhost:8000/api/fusion-truthfulness"
@@ -23,7 +27,7 @@ test_scenarios = [
     {
         "name": "Missing Face",
         "input": {"voice": [0.7, 0.3], "text": [0.6, 0.4]},
-        "expected": 0.233
+        "expected": 0.35
     },
     {
         "name": "Neutral Case",
@@ -79,5 +83,27 @@ def test_fusion():
     print(f"Failed: {failed}")
     print(f"Success Rate: {(passed/(passed+failed)*100):.1f}%")
 
+def test_fusion_series():
+    # In-process, so the series endpoint is checked without a running server
+    app = FastAPI()
+    app.include_router(fusion_api.router)
+    client = TestClient(app)
+
+    # All scenarios as one series; a modality missing from a scenario is null at that step
+    series = {
+        key: [scenario["input"].get(key) for scenario in test_scenarios]
+        for key in ("face", "voice", "text")
+    }
+
+    response = client.post("/api/fusion-truthfulness/series", json=series)
+    assert response.status_code == 200
+    scores = response.json()["scores"]
+    assert len(scores) == len(test_scenarios)
+    for scenario, actual_score in zip(test_scenarios, scores):
+        assert actual_score is not None, scenario["name"]
+        assert abs(actual_score - scenario["expected"]) < 0.01, f"{scenario['name']}: {actual_score}"
+
+
 if __name__ == "__main__":
     test_fusion()
+    test_fusion_series()
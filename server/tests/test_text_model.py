@@ -3,6 +3,7 @@ import time
 
 # API endpoint
 API_URL = "http://localhost:8000/api/text-sentiment"
+BATCH_API_URL = "http://localhost:8000/api/text-sentiment/batch"
 
 # Test cases with ground truth labels
 test_cases = [
@@ -143,5 +144,31 @@ def test_text_model():
     else:
         print("No test results to summarize")
 
+def test_text_model_batch():
+    print("Testing Batch Text Analysis")
+
+    texts = [case["text"] for case in test_cases]
+    try:
+        start_time = time.time()
+        response = requests.post(BATCH_API_URL, json={"texts": texts})
+        end_time = time.time()
+    except requests.exceptions.ConnectionError:
+        print(f" Connection Error: Cannot connect to {BATCH_API_URL}")
+        return
+
+    if response.status_code != 200:
+        print(f"HTTP Error: {response.status_code}")
+        return
+
+    results = response.json()
+    if len(results) != len(test_cases):
+        print(f"Expected {len(test_cases)} results, got {len(results)}")
+        return
+
+    correct = sum(1 for case, r in zip(test_cases, results) if r.get('label') == case["ground_truth"])
+    print(f"Accuracy: {correct / len(test_cases) * 100:.1f}% ({correct}/{len(test_cases)})")
+    print(f"Total Processing Time: {(end_time - start_time) * 1000:.0f}ms")
+
 if __name__ == "__main__":
     test_text_model()
+    test_text_model_batch()
@@ -0,0 +1,84 @@
+"""Compare text inference engines in-process on the labelled cases from test_text_model.py.
+
+Run from the server directory:
+    python -m tests.text_engine_parity
+"""
+import asyncio
+import time
+
+from model_api import model_store, text_api
+from tests.test_text_model import test_cases
+
+# Timed passes per case, after one untimed warmup pass
+REPEATS = 5
+
+
+def load_base_model(device):
+    """A separate fp32 copy of the text model; the server keeps only its engine model."""
+    from transformers import DistilBertForSequenceClassification
+
+    source, options = model_store.resolve(text_api.TEXT_MODEL_REPO)
+    model = DistilBertForSequenceClassification.from_pretrained(source, **options)
+    model.to(device)
+    model.eval()
+    return model
+
+
+def evaluate_engine(base_model, engine):
+    tokenizer = text_api._state['tokenizer']
+    device = text_api._state['device']
+    text_api._state['model'] = text_api.build_text_engine(base_model, tokenizer, engine, device)
+    text_api._state['engine'] = engine
+
+    results = []
+    latencies = []
+    for case in test_cases:
+        text_api._predict_batch([case["text"]])
+        start_time = time.time()
+        for _ in range(REPEATS):
+            scored, _, _ = text_api._predict_batch([case["text"]])
+        latencies.append((time.time() - start_time) / REPEATS * 1000)
+        results.append(scored[0])
+    return results, latencies
+
+
+def main():
+    asyncio.run(text_api.init_text_model())
+    if text_api._state['model'] is None:
+        print("Text model failed to load")
+        return
+    base_model = load_base_model(text_api._state['device'])
+
+    print("Text Inference Engine Parity")
+    print(f"Total Test Cases: {len(test_cases)}\n")
+
+    baseline = None
+    for engine in text_api.TEXT_ENGINES:
+        try:
+            results, latencies = evaluate_engine(base_model, engine)
+        except Exception as e:
+            print(f"{engine:>7}: unavailable ({e})\n")
+            continue
+
+        correct = sum(1 for case, r in zip(test_cases, results) if r["label"] == case["ground_truth"])
+        accuracy = correct / len(test_cases) * 100
+        avg_latency = sum(latencies) / len(latencies)
+        p95_latency = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+
+        print(f"{engine:>7}: Accuracy {accuracy:.1f}% ({correct}/{len(test_cases)}) | "
+              f"Avg {avg_latency:.1f}ms | P95 {p95_latency:.1f}ms")
+
+        if baseline is None:
+            baseline = (accuracy, avg_latency, results)
+        else:
+            base_accuracy, base_latency, base_results = baseline
+            agree = sum(1 for a, b in zip(base_results, results) if a["label"] == b["label"])
+            max_diff = max(abs(a["score"] - b["score"]) for a, b in zip(base_results, results))
+            print(f"         vs eager: accuracy {accuracy - base_accuracy:+.1f} pts | "
+                  f"speedup {base_latency / avg_latency:.2f}x | "
+                  f"label agreement {agree}/{len(test_cases)} | max score diff {max_diff:.4f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()